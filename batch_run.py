@@ -0,0 +1,145 @@
+import argparse
+import json
+from modules.batch_runner import BatchRunner
+from modules.main_controller import MainController
+from modules.event_sink import EventSink, ConsoleEventSink
+from modules.tournament import TournamentScheduler, BatchTournamentScheduler
+from modules.strategy_simulator import StrategySimulator
+from modules.game_rules import GameRules
+from modules.strategies import STRATEGIES
+from modules.response_parser import ParseOutcome
+from modules.config_manager import ConfigManager
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Run LLM games without the Streamlit UI")
+    parser.add_argument("--game", default="prisoner_dilemma", help="Game config name in config/games/")
+    parser.add_argument("--output", help="Write match results and standings to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Print a summary line per round")
+    parser.add_argument("--cache-mode", choices=["off", "record", "replay"],
+                        help="Response cache mode for this run (default: response_cache.mode in config.json)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    games = subparsers.add_parser("games", help="Play the same line-up several times")
+    games.add_argument("--players", nargs="+", required=True, help="Role names from config/roles.json")
+    games.add_argument("-n", "--n-games", type=int, default=1)
+
+    round_robin = subparsers.add_parser("round-robin", help="Play every pair of roles against each other")
+    round_robin.add_argument("--roles", nargs="+", help="Subset of roles (default: all of config/roles.json)")
+    round_robin.add_argument("--repetitions", type=int, default=1)
+    round_robin.add_argument("--self-play", action="store_true", help="Also pair each role with itself")
+
+    tournament = subparsers.add_parser("tournament", help="Roles x models x repetitions across a process pool")
+    tournament.add_argument("--roles", nargs="+", help="Subset of roles (default: all of config/roles.json)")
+    tournament.add_argument("--models", nargs="+", help="provider/model combos to cross with the pairings (default: each role's own)")
+    tournament.add_argument("--repetitions", type=int, default=1)
+    tournament.add_argument("--self-play", action="store_true", help="Also pair each role with itself")
+    tournament.add_argument("--seed", type=int, default=0, help="Base seed; repetition k uses seed + k")
+    tournament.add_argument("--workers", type=int, help="Worker processes (default: CPU count)")
+    tournament.add_argument("--max-inflight", type=int, help="Global cap on concurrent LLM requests")
+    tournament.add_argument("--batch-api", choices=["openai", "local"],
+                            help="Submit each round of all games as provider batch jobs instead of live requests "
+                                 "('local' answers them through the file-based stand-in endpoint)")
+    tournament.add_argument("--poll-interval", type=float, help="Seconds between batch status polls (default: config.json)")
+    tournament.add_argument("--resume", metavar="RESULTS_FILE",
+                            help="Continue an interrupted tournament from its results file and checkpoints")
+
+    resume_game = subparsers.add_parser("resume-game", help="Finish an interrupted game from its checkpoint")
+    resume_game.add_argument("checkpoint", help="Checkpoint file under <log_directory>/checkpoints/")
+
+    simulate = subparsers.add_parser("simulate", help="Baseline round-robin of algorithmic strategies, no LLM calls")
+    simulate.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), help="Default: all strategies")
+    simulate.add_argument("--rounds", type=int, help="Rounds per game (default: max_rounds of the game)")
+    simulate.add_argument("--repetitions", type=int, default=1000, help="Games per pairing")
+    simulate.add_argument("--seed", type=int, default=0)
+
+    export = subparsers.add_parser("export", help="Export new game logs to Parquet tables and write aggregate reports")
+    export.add_argument("--output-dir", help="Directory for the tables and reports (default: analytics.directory in config.json)")
+    export.add_argument("--no-reports", action="store_true", help="Only update the tables")
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    if args.command == "simulate":
+        simulator = StrategySimulator(GameRules(args.game), seed=args.seed)
+        report = simulator.run(args.strategies, rounds=args.rounds, repetitions=args.repetitions)
+        print(f"\n{report['games']} game(s) of {report['rounds']} rounds simulated "
+              f"({report['rounds_per_s']:,.0f} rounds/s)")
+        for name, row in sorted(report["standings"].items(), key=lambda item: -item[1]["average_score"]):
+            print(f"{name:30} games={row['games']:8} wins={row['wins']:8} avg={row['average_score']:.2f}")
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, ensure_ascii=False, indent=4)
+            print(f"Results written to {args.output}")
+        return
+
+    if args.command == "export":
+        # pandas and pyarrow are only needed here, so other commands start without them
+        from modules.analytics_export import AnalyticsExporter
+        exporter = AnalyticsExporter.from_config(ConfigManager().config, args.output_dir)
+        counts = exporter.export()
+        print(f"{counts.pop('logs')} new or changed log(s) exported to {exporter.output_directory}")
+        for table, rows in counts.items():
+            print(f"{table:12} +{rows} rows")
+        if not args.no_reports:
+            for path in exporter.write_reports():
+                print(f"Report written to {path}")
+        return
+
+    if args.command == "resume-game":
+        controller = MainController(sink=ConsoleEventSink() if args.verbose else EventSink(), cache_mode=args.cache_mode)
+        game_state = controller.resume_game(args.checkpoint)
+        print(f"\nGame finished after {game_state['round']} rounds")
+        for player, score in game_state["cumulative_scores"].items():
+            print(f"{player:30} {score}")
+        return
+
+    if args.command == "tournament":
+        scheduler_class = BatchTournamentScheduler if args.batch_api else TournamentScheduler
+        batch_options = {"endpoint": args.batch_api, "poll_interval": args.poll_interval} if args.batch_api else {}
+        scheduler = scheduler_class(
+            game_name=args.game,
+            role_names=args.roles,
+            models=args.models,
+            repetitions=args.repetitions,
+            self_play=args.self_play,
+            base_seed=args.seed,
+            max_workers=args.workers,
+            max_inflight_requests=args.max_inflight,
+            cache_mode=args.cache_mode,
+            **batch_options
+        )
+        progress = (lambda result, done, total: print(f"[{done}/{total}] job {result['job_id']} finished")) if args.verbose else None
+        results = scheduler.resume(args.resume, on_result=progress) if args.resume else scheduler.run(on_result=progress)
+        cache_rows = [result["cache"] for result in results if "cache" in result]
+        cache_stats = {
+            "hits": sum(row["hits"] for row in cache_rows),
+            "misses": sum(row["misses"] for row in cache_rows)
+        } if cache_rows else None
+    else:
+        runner = BatchRunner(sink=ConsoleEventSink() if args.verbose else EventSink(), cache_mode=args.cache_mode)
+        if args.command == "games":
+            results = runner.run_games(args.game, args.players, args.n_games)
+        else:
+            results = runner.run_round_robin(args.game, args.roles, args.repetitions, args.self_play)
+        cache_stats = runner.cache_stats()
+
+    standings = BatchRunner.standings(results)
+    print(f"\n{len(results)} game(s) played")
+    for role_name, row in sorted(standings.items(), key=lambda item: -item[1]["average_score"]):
+        print(f"{role_name:30} games={row['games']:4} wins={row['wins']:4} avg={row['average_score']:.2f}")
+    if cache_stats:
+        print(f"Response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+    parse_stats = BatchRunner.parse_stats(results)
+    if parse_stats:
+        defaulted = sum(parse_stats.get(outcome, 0) for outcome in ParseOutcome.FAILURES)
+        print(f"Parsed actions: {', '.join(f'{outcome}={count}' for outcome, count in sorted(parse_stats.items()))} "
+              f"({defaulted} fell back to the default action)")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({"results": results, "standings": standings}, f, ensure_ascii=False, indent=4)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
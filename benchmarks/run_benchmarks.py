@@ -0,0 +1,230 @@
+"""Benchmarks for the game loop, prompt generation, response parsing and logging.
+
+Run from anywhere:
+    python benchmarks/run_benchmarks.py --output bench_results.json
+
+LLM calls go to the offline mock provider, so results measure orchestration
+overhead only. The import benchmark starts a fresh interpreter per core module;
+with --check-imports the run fails if one of them loads streamlit, pandas,
+pyarrow, openai or httpx at import time. Results are written as JSON for comparison across commits.
+"""
+import argparse
+import contextlib
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# Config paths are relative to the repository root
+os.chdir(REPO_ROOT)
+
+from modules.main_controller import MainController
+from modules.role_manager import RoleManager, Role
+from modules.prompt_generator import PromptGenerator
+from modules.response_parser import ResponseParser
+from modules.logging_module import LoggingModule
+from modules.game_rules import GameRules
+
+GAME_NAME = "prisoner_dilemma"
+
+# Engine modules that worker processes and batch jobs import; none of them should
+# load the UI, analytics or provider client libraries before they are used
+CORE_MODULES = [
+    "modules.game_rules", "modules.prompt_generator", "modules.response_parser",
+    "modules.llm_access", "modules.match_state", "modules.main_controller", "modules.tournament"
+]
+DEFERRED_MODULES = ["streamlit", "pandas", "pyarrow", "openai", "httpx"]
+
+def _quiet():
+    """The modules print debug output on every call; keep it out of the measurements' console"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+def _per_call(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+    return {"iterations": iterations, "total_s": elapsed, "per_call_us": elapsed / iterations * 1e6}
+
+def bench_game_loop(n_games):
+    role_manager = RoleManager()
+    role_manager.clear_temp_roles()
+    role_manager.add_temp_role("Bench A", "Cooperate when possible", {"provider": "mock", "model": "tit-for-tat"})
+    role_manager.add_temp_role("Bench B", "Behave randomly", {"provider": "mock", "model": "random"})
+
+    with tempfile.TemporaryDirectory() as log_dir, _quiet():
+        controller = MainController(role_manager=role_manager, cache_mode='off')
+        controller.logging = LoggingModule(log_directory=log_dir, log_format=controller.logging.log_format)
+        rounds = 0
+        start = time.perf_counter()
+        for _ in range(n_games):
+            rounds += controller.run_game(GAME_NAME, ["Bench A", "Bench B"])["round"]
+        elapsed = time.perf_counter() - start
+    role_manager.clear_temp_roles()
+    return {
+        "games": n_games,
+        "rounds": rounds,
+        "total_s": elapsed,
+        "games_per_s": n_games / elapsed,
+        "rounds_per_s": rounds / elapsed
+    }
+
+def _bench_roles():
+    return [Role(name, "Tend to cooperate, but will remember if the other agent defects",
+                 {"provider": "mock", "model": "tit-for-tat"}) for name in ("Bench A", "Bench B")]
+
+def _bench_state(roles):
+    return {
+        "round": 5,
+        "actions": {role.name: {"action": "Cooperate", "raw_response": "<Action>Cooperate</Action>"} for role in roles},
+        "payoffs": {role.name: 3 for role in roles},
+        "reflections": {role.name: "Keep cooperating." for role in roles},
+        "cumulative_scores": {role.name: 15 for role in roles}
+    }
+
+def bench_prompt_generation(iterations):
+    with _quiet():
+        generator = PromptGenerator(language='en')
+        game_rules = GameRules(GAME_NAME)
+        roles = _bench_roles()
+        game_state = _bench_state(roles)
+        return {
+            "action_prompt": _per_call(lambda: generator.generate_prompt(roles[0], game_state, game_rules), iterations),
+            "reflection_prompt": _per_call(lambda: generator.generate_reflection_prompt(roles[0], game_state, game_rules), iterations)
+        }
+
+def bench_response_parsing(iterations, sizes):
+    with _quiet():
+        parser = ResponseParser()
+        game_rules = GameRules(GAME_NAME)
+        actions = game_rules.get_actions()
+        results = {}
+        for size in sizes:
+            # Long reasoning followed by the tag, the usual shape of reasoning-model output
+            filler = ("Considering whether the other player will cooperate or defect next. " * (size // 70 + 1))[:size]
+            tagged = filler + "\n<Action>Defect</Action>"
+            untagged = filler + "\nI will defect."
+            reflection = "<Reflection>" + filler + "</Reflection>"
+            structured = json.dumps({"action": "Defect", "reflection": filler})
+            results[str(size)] = {
+                "tagged": _per_call(lambda: parser.parse_response(tagged, actions), iterations),
+                "untagged": _per_call(lambda: parser.parse_response(untagged, actions), iterations),
+                "reflection": _per_call(lambda: parser.parse_reflection(reflection), iterations),
+                "json": _per_call(lambda: parser.parse_response(structured, actions), iterations)
+            }
+        return results
+
+def bench_logging(lengths):
+    roles = _bench_roles()
+    round_data = _bench_state(roles)
+    # Raw responses dominate real logs
+    for data in round_data["actions"].values():
+        data["raw_response"] = "x" * 4000
+    results = {}
+    with tempfile.TemporaryDirectory() as log_dir, _quiet():
+        for log_format in ("json", "jsonl"):
+            results[log_format] = {}
+            for length in lengths:
+                logger = LoggingModule(log_directory=log_dir, log_format=log_format)
+                logger.start_game_log(f"bench_{log_format}_{length}")
+                timings = []
+                for _ in range(length):
+                    start = time.perf_counter()
+                    logger.log_round(round_data)
+                    timings.append(time.perf_counter() - start)
+                results[log_format][str(length)] = {
+                    "rounds": length,
+                    "total_s": sum(timings),
+                    "mean_round_us": sum(timings) / length * 1e6,
+                    "last_round_us": timings[-1] * 1e6
+                }
+    return results
+
+def bench_imports(repeats):
+    """Import time of each core module in a fresh interpreter, and the deferred libraries it pulled in"""
+    script = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        "import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        "print(json.dumps({{'s': elapsed, 'loaded': [m for m in {deferred!r} if m in sys.modules]}}))"
+    )
+    results = {}
+    for module in CORE_MODULES:
+        runs = []
+        for _ in range(repeats):
+            output = subprocess.check_output(
+                [sys.executable, "-c", script.format(module=module, deferred=DEFERRED_MODULES)],
+                cwd=REPO_ROOT, text=True
+            )
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        times = [run["s"] * 1000 for run in runs]
+        results[module] = {
+            "repeats": repeats,
+            "best_ms": min(times),
+            "mean_ms": sum(times) / repeats,
+            "deferred_loaded": runs[0]["loaded"]
+        }
+    return results
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the game engine against the offline mock provider")
+    parser.add_argument("--output", help="Write results to this JSON file (default: print to stdout)")
+    parser.add_argument("--games", type=int, default=50, help="Games to play for the game loop benchmark")
+    parser.add_argument("--iterations", type=int, default=1000, help="Calls per prompt/parser measurement")
+    parser.add_argument("--parse-sizes", type=int, nargs="+", default=[1000, 100000, 1000000],
+                        help="Response sizes in characters for the parser benchmark")
+    parser.add_argument("--log-lengths", type=int, nargs="+", default=[10, 100, 500],
+                        help="Game lengths in rounds for the logging benchmark")
+    parser.add_argument("--import-repeats", type=int, default=5, help="Fresh interpreters per module for the import benchmark")
+    parser.add_argument("--check-imports", action="store_true",
+                        help=f"Exit with status 1 if a core module imports any of {', '.join(DEFERRED_MODULES)}")
+    args = parser.parse_args(argv)
+
+    with _quiet():
+        results = {
+            "game_loop": bench_game_loop(args.games),
+            "prompt_generation": bench_prompt_generation(args.iterations),
+            "response_parsing": bench_response_parsing(max(1, args.iterations // 10), args.parse_sizes),
+            "logging": bench_logging(args.log_lengths),
+            "imports": bench_imports(args.import_repeats)
+        }
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec='seconds'),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results
+    }
+
+    output = json.dumps(report, indent=4)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Benchmark results written to {args.output}")
+    else:
+        print(output)
+
+    eager = {module: row["deferred_loaded"] for module, row in results["imports"].items() if row["deferred_loaded"]}
+    if args.check_imports and eager:
+        for module, loaded in eager.items():
+            print(f"{module} imports {', '.join(loaded)} at import time", file=sys.stderr)
+        sys.exit(1)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,11 @@ import os
 from modules.main_controller import MainController
 from modules.config_manager import ConfigManager
 from modules.role_manager import RoleManager
-from modules.llm_access import LLMAccess
+from modules.config_registry import get_registry
+from modules.streamlit_sink import StreamlitEventSink, LiveGameEventSink, lazy_expander, render_round_details
+from modules.logging_module import list_game_logs, GameLogReader
+from modules.strategies import STRATEGIES
+from modules.checkpoint import list_checkpoints
 import pandas as pd
 from datetime import datetime
 
@@ -13,11 +17,31 @@ class StreamlitGameApp:
         # 创建一个共享的RoleManager实例
         self.role_manager = RoleManager()
         
-        # 将共享的RoleManager传递给MainController
-        self.controller = MainController(role_manager=self.role_manager)
+        # Streamlit runs this script on every interaction; the controller (with its clients,
+        # response cache and log index) is kept for the session and only rebuilt when
+        # config.json or llm_providers.json changed on disk
+        registry = get_registry()
+        config_files = (registry.app_config(), registry.providers())
+        session_objects = st.session_state.get('app_objects')
+        if not session_objects or any(old is not new for old, new in zip(session_objects['config_files'], config_files)):
+            config_manager = ConfigManager()
+            # The live view updates a few placeholders in place; the transcript view appends every event
+            live_view = config_manager.get_config('live_view') is not False
+            sink = LiveGameEventSink() if live_view else StreamlitEventSink()
+            session_objects = st.session_state.app_objects = {
+                "config_files": config_files,
+                "config_manager": config_manager,
+                "live_view": live_view,
+                "sink": sink,
+                # 将共享的RoleManager传递给MainController
+                "controller": MainController(role_manager=self.role_manager, sink=sink)
+            }
         
-        self.config_manager = ConfigManager()
-        self.llm_access = LLMAccess()
+        self.config_manager = session_objects["config_manager"]
+        self.live_view = session_objects["live_view"]
+        self.sink = session_objects["sink"]
+        self.controller = session_objects["controller"]
+        self.llm_access = self.controller.llm_access
         
         # Initialize session state for storing custom roles
         if 'custom_roles' not in st.session_state:
@@ -55,6 +79,8 @@ class StreamlitGameApp:
         for provider_name, provider_info in providers.items():
             for model in provider_info["available_models"]:
                 provider_model_options.append(f"{provider_name}-{model}")
+        # Local algorithmic players need no provider
+        provider_model_options.extend(f"strategy-{name}" for name in STRATEGIES)
         
         with st.form(key="add_role_form"):
             col1, col2 = st.columns(2)
@@ -118,20 +144,19 @@ class StreamlitGameApp:
         if "actions" in game_state:
             st.write("Actions:")
             actions_df = pd.DataFrame([
-                {"Role": role, "Action": data['action']}
+                {"Role": role, "Action": data['action'], "Parsed from": data.get('parse_outcome', '')}
                 for role, data in game_state["actions"].items()
             ])
             st.table(actions_df)
             
-            # Display raw responses
+            # Display raw responses (only rendered once expanded)
             st.write("Raw Responses:")
             for role, data in game_state["actions"].items():
                 if "raw_response" in data:
-                    with st.expander(f"{role}'s raw response"):
-                        if view_mode == "markdown":
-                            st.markdown(f"```\n{data['raw_response']}\n```")
-                        else:
-                            st.code(data['raw_response'])
+                    lazy_expander(
+                        f"{role}'s raw response", f"status_{game_state['round']}_{role}_raw",
+                        lambda text=data['raw_response'] or "": st.code(text, language=None)
+                    )
 
         # Display payoffs
         if "payoffs" in game_state:
@@ -150,61 +175,143 @@ class StreamlitGameApp:
                     st.write(reflection)
                 st.write("---")  # Add separator between reflections
 
+    GAMES_PER_PAGE = 25
+    ROUNDS_PER_PAGE = 20
+
+    @staticmethod
+    def _game_label(game):
+        players = ", ".join(
+            f"{name} ({game['models'][name]})" if game["models"].get(name) else name for name in game["players"]
+        )
+        status = "" if game["finished"] else " · unfinished"
+        return f"{game['started_at']} · {game['game']} · {players} · {game['rounds']} rounds{status}"
+
+    def select_game_log(self, key):
+        """Pick a game log; returns (log file name, indexed game row or None).
+
+        With the log index, games are filtered and paged with queries; without
+        it the log directory is listed as before.
+        """
+        log_dir = self.config_manager.get_config('log_directory')
+        index = self.controller.logging.index
+        
+        if index is None:
+            if not os.path.exists(log_dir):
+                st.warning("No game logs found.")
+                return None, None
+            log_files = list_game_logs(log_dir)
+            if not log_files:
+                st.warning("No game logs available.")
+                return None, None
+            return st.selectbox("Select Game Log", log_files, key=f"{key}_log"), None
+        
+        # Logs written before the index existed are added once per session
+        if not st.session_state.get('log_index_synced') and os.path.exists(log_dir):
+            index.sync(log_dir)
+            st.session_state.log_index_synced = True
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            game_filter = st.selectbox("Game", ["All"] + index.games_list(), key=f"{key}_game")
+        with col2:
+            player_filter = st.text_input("Player contains", key=f"{key}_player")
+        with col3:
+            model_filter = st.text_input("Model contains", key=f"{key}_model")
+        filters = {
+            "game": None if game_filter == "All" else game_filter,
+            "player": player_filter or None,
+            "model": model_filter or None
+        }
+        
+        total = index.count_games(**filters)
+        if not total:
+            st.warning("No game logs available.")
+            return None, None
+        pages = (total + self.GAMES_PER_PAGE - 1) // self.GAMES_PER_PAGE
+        page = st.number_input(f"Page (of {pages}, {total} games)", 1, pages, 1, key=f"{key}_page")
+        
+        games = index.query_games(limit=self.GAMES_PER_PAGE, offset=(page - 1) * self.GAMES_PER_PAGE, **filters)
+        labels = {game["log_id"]: self._game_label(game) for game in games}
+        selected = st.selectbox("Select Game Log", list(labels), format_func=labels.get, key=f"{key}_log")
+        game = next(game for game in games if game["log_id"] == selected)
+        return game["file"], game
+
+    def log_reader(self, log_file):
+        """GameLogReader for a log, kept for the session so its round offsets are scanned once"""
+        readers = st.session_state.setdefault('log_readers', {})
+        if log_file not in readers:
+            readers[log_file] = GameLogReader(os.path.join(self.config_manager.get_config('log_directory'), log_file))
+        return readers[log_file]
+
+    def count_rounds(self, log_file, game):
+        return game["rounds"] if game is not None else len(self.log_reader(log_file))
+
+    def load_rounds(self, log_file, game, start=1, end=None):
+        """Rounds start..end (1-based, inclusive) of the selected log, from the index when available"""
+        if game is not None:
+            return self.controller.logging.index.get_rounds(game["log_id"], start, end)
+        return list(self.log_reader(log_file).rounds(start, end))
+
+    def iter_rounds(self, log_file, game, start, end, chunk_size=100):
+        """Rounds start..end, loaded chunk_size at a time"""
+        for chunk_start in range(start, end + 1, chunk_size):
+            yield from self.load_rounds(log_file, game, chunk_start, min(end, chunk_start + chunk_size - 1))
+
+    def round_page(self, total_rounds, key, first=1):
+        """Page selector over rounds first..total_rounds; returns the page's (start, end)"""
+        count = total_rounds - first + 1
+        pages = max(1, (count + self.ROUNDS_PER_PAGE - 1) // self.ROUNDS_PER_PAGE)
+        page = st.number_input(f"Rounds page (of {pages})", 1, pages, 1, key=key)
+        start = first + (page - 1) * self.ROUNDS_PER_PAGE
+        return start, min(total_rounds, start + self.ROUNDS_PER_PAGE - 1)
+
     def render_history_viewer(self):
         st.subheader("Game History")
         
-        # Get log files
-        log_dir = self.config_manager.get_config('log_directory')
-        if not os.path.exists(log_dir):
-            st.warning("No game logs found.")
-            return
-
-        log_files = [f for f in os.listdir(log_dir) if f.endswith('.json')]
-        if not log_files:
-            st.warning("No game logs available.")
+        selected_log, game = self.select_game_log("plain_history")
+        if not selected_log:
             return
         
-        selected_log = st.selectbox("Select Game Log", log_files, key="plain_history_log")
-        
         # Add option to show raw responses - with unique key
         show_raw_responses = st.checkbox("Show Raw Responses", value=False, key="history_raw_responses")
         
-        if selected_log:
-            with open(os.path.join(log_dir, selected_log), 'r') as f:
-                log_data = json.load(f)
-                
-            for round_idx, round_data in enumerate(log_data):
-                with st.expander(f"Round {round_idx + 1}"):
-                    self.render_game_status(round_data, "plain") if show_raw_responses else self.render_game_status({
-                        "round": round_data["round"],
-                        "actions": {k: {"action": v["action"]} for k, v in round_data["actions"].items()} if "actions" in round_data else {},
-                        "payoffs": round_data.get("payoffs", {}),
-                        "reflections": round_data.get("reflections", {})
-                    }, "plain")
+        # Rounds are shown a page at a time
+        first_round, last_round = self.round_page(self.count_rounds(selected_log, game), "plain_history_round_page")
+        log_data = self.load_rounds(selected_log, game, first_round, last_round)
+        
+        # One table for the whole page instead of a table per round
+        st.dataframe(pd.DataFrame([
+            {"Round": round_data.get("round", round_idx + 1), "Player": player, "Action": data["action"],
+             "Payoff": round_data.get("payoffs", {}).get(player, 0)}
+            for round_idx, round_data in enumerate(log_data, start=first_round - 1)
+            for player, data in round_data.get("actions", {}).items()
+        ]), hide_index=True)
+        
+        # Reflections and raw responses are rendered only for the rounds that are opened
+        for round_idx, round_data in enumerate(log_data, start=first_round - 1):
+            lazy_expander(
+                f"Round {round_idx + 1} details", f"plain_history_{selected_log}_{round_idx + 1}",
+                lambda round_data=round_data: self.render_round_text(round_data, show_raw_responses)
+            )
+    
+    def render_round_text(self, round_data, show_raw_responses):
+        for role, reflection in round_data.get("reflections", {}).items():
+            st.write(f"**{role}'s reflection:**")
+            st.write(reflection)
+        if show_raw_responses:
+            for role, data in round_data.get("actions", {}).items():
+                if data.get("raw_response"):
+                    st.write(f"**{role}'s raw response:**")
+                    st.code(data["raw_response"], language=None)
 
     def render_markdown_viewer(self):
         st.subheader("Game History (Markdown View)")
         
-        # Get log files
-        log_dir = self.config_manager.get_config('log_directory')
-        if not os.path.exists(log_dir):
-            st.warning("No game logs found.")
-            return
-
-        log_files = [f for f in os.listdir(log_dir) if f.endswith('.json')]
-        if not log_files:
-            st.warning("No game logs available.")
-            return
-        
         # File selection
-        selected_log = st.selectbox("Select Game Log", log_files, key="markdown_history_log")
+        selected_log, game = self.select_game_log("markdown_history")
         
         if not selected_log:
             return
-            
-        # Load the selected log
-        with open(os.path.join(log_dir, selected_log), 'r') as f:
-            log_data = json.load(f)
         
         # Add filtering options
         st.write("### Display Options")
@@ -212,17 +319,16 @@ class StreamlitGameApp:
         
         with col1:
             # Option to show specific content
-            show_actions = st.checkbox("Show Actions", value=True, key="markdown_actions")
-            show_raw_responses = st.checkbox("Show Raw Responses", value=True, key="markdown_raw_responses")
-            show_payoffs = st.checkbox("Show Payoffs", value=True, key="markdown_payoffs")
-            show_reflections = st.checkbox("Show Reflections", value=True, key="markdown_reflections")
+            options = {
+                "actions": st.checkbox("Show Actions", value=True, key="markdown_actions"),
+                "raw_responses": st.checkbox("Show Raw Responses", value=True, key="markdown_raw_responses"),
+                "payoffs": st.checkbox("Show Payoffs", value=True, key="markdown_payoffs"),
+                "reflections": st.checkbox("Show Reflections", value=True, key="markdown_reflections")
+            }
             
         with col2:
-            # Get all player names from the log
-            all_players = set()
-            for round_data in log_data:
-                if "actions" in round_data:
-                    all_players.update(round_data["actions"].keys())
+            # Player names come from the index or the log header, not from reading every round
+            all_players = game["players"] if game is not None else self.log_reader(selected_log).players()
             
             # Player filter if we have players
             selected_players = st.multiselect(
@@ -233,89 +339,118 @@ class StreamlitGameApp:
             )
             
             # Round range selection
-            total_rounds = len(log_data)
+            total_rounds = self.count_rounds(selected_log, game)
+            if total_rounds == 0:
+                st.info("No rounds logged yet.")
+                return
             round_range = st.slider("Round Range", 1, total_rounds, (1, total_rounds))
         
-        # Generate markdown content based on filters
-        markdown_content = []
+        # The markdown file is written round by round on request, never held as one string
+        if st.button("Prepare Markdown Download", key="markdown_prepare"):
+            export_path = os.path.join("cache", "exports", f"{os.path.splitext(selected_log)[0]}_{round_range[0]}-{round_range[1]}.md")
+            with st.spinner("Writing markdown..."):
+                self.write_markdown_export(
+                    export_path, self.iter_rounds(selected_log, game, round_range[0], round_range[1]),
+                    options, selected_players, first_round=round_range[0]
+                )
+            st.session_state.markdown_export = (selected_log, export_path)
+        export = st.session_state.get('markdown_export')
+        if export and export[0] == selected_log and os.path.exists(export[1]):
+            with open(export[1], 'rb') as f:
+                st.download_button(
+                    "Download as Markdown",
+                    f,
+                    file_name=f"game_log_{os.path.basename(export[1])}",
+                    mime="text/markdown"
+                )
+        
+        # Only the page of rounds on screen is loaded and rendered
+        first_round, last_round = self.round_page(round_range[1], "markdown_round_page", first=round_range[0])
+        for round_number, round_data in enumerate(self.load_rounds(selected_log, game, first_round, last_round), start=first_round):
+            st.markdown(self.round_markdown(round_number, round_data, options, selected_players))
+
+    @staticmethod
+    def round_markdown(round_number, round_data, options, selected_players):
+        """Markdown for one round; options holds the actions/raw_responses/payoffs/reflections switches"""
+        round_content = [f"## Round {round_number}\n"]
         
-        # Only process rounds in the selected range
-        for round_idx in range(round_range[0]-1, round_range[1]):
-            if round_idx >= len(log_data):
-                break
+        # Display actions
+        if options["actions"] and "actions" in round_data:
+            round_content.append("### Actions:")
+            actions_text = []
+            for role, data in round_data["actions"].items():
+                if selected_players and role not in selected_players:
+                    continue
+                actions_text.append(f"- **{role}**: {data['action']}")
                 
-            round_data = log_data[round_idx]
-            round_content = [f"## Round {round_idx + 1}\n"]
+                # Add raw responses if enabled
+                if options["raw_responses"] and "raw_response" in data:
+                    actions_text.append(f"  \n---\nRaw response:\n```\n{data['raw_response']}\n```\n---\n")
             
-            # Filter players if needed
-            filtered_players = selected_players if selected_players else (
-                round_data["actions"].keys() if "actions" in round_data else []
-            )
+            round_content.append("\n".join(actions_text) + "\n")
+
+        # Display payoffs (fix list/dict handling issue)
+        if options["payoffs"] and "payoffs" in round_data:
+            round_content.append("### Payoffs:")
+            payoffs_text = []
             
-            # Display actions
-            if show_actions and "actions" in round_data:
-                round_content.append("### Actions:")
-                actions_text = []
-                for role, data in round_data["actions"].items():
+            # Check if payoffs is a list or dict and handle accordingly
+            if isinstance(round_data["payoffs"], dict):
+                # If it's a dict, handle as originally planned
+                for role, score in round_data["payoffs"].items():
                     if not selected_players or role in selected_players:
-                        actions_text.append(f"- **{role}**: {data['action']}")
-                        
-                    # Add raw responses if enabled
-                    if show_raw_responses and "raw_response" in data:
-                        actions_text.append(f"  \n---\nRaw response:\n```\n{data['raw_response']}\n```\n---\n")
-                
-                round_content.append("\n".join(actions_text) + "\n")
-
-            # Display payoffs (fix list/dict handling issue)
-            if show_payoffs and "payoffs" in round_data:
-                round_content.append("### Payoffs:")
-                payoffs_text = []
-                
-                # Check if payoffs is a list or dict and handle accordingly
-                if isinstance(round_data["payoffs"], dict):
-                    # If it's a dict, handle as originally planned
-                    for role, score in round_data["payoffs"].items():
+                        payoffs_text.append(f"- **{role}**: {score}")
+            elif isinstance(round_data["payoffs"], list):
+                # If it's a list, try to get the first element (which might be a dict)
+                if round_data["payoffs"] and isinstance(round_data["payoffs"][0], dict):
+                    for role, score in round_data["payoffs"][0].items():
                         if not selected_players or role in selected_players:
                             payoffs_text.append(f"- **{role}**: {score}")
-                elif isinstance(round_data["payoffs"], list):
-                    # If it's a list, try to get the first element (which might be a dict)
-                    if round_data["payoffs"] and isinstance(round_data["payoffs"][0], dict):
-                        for role, score in round_data["payoffs"][0].items():
-                            if not selected_players or role in selected_players:
-                                payoffs_text.append(f"- **{role}**: {score}")
-                    else:
-                        # If not in expected format, simply display raw content
-                        payoffs_text.append(f"- Raw payoffs data: {round_data['payoffs']}")
                 else:
-                    # Other type cases
-                    payoffs_text.append(f"- Payoffs data format not recognized: {type(round_data['payoffs'])}")
-                
-                round_content.append("\n".join(payoffs_text) + "\n")
-
-            # Display reflections
-            if show_reflections and "reflections" in round_data:
-                round_content.append("### Reflections:")
-                for role, reflection in round_data["reflections"].items():
-                    if not selected_players or role in selected_players:
-                        round_content.append(f"#### {role}'s reflection:")
-                        round_content.append(reflection + "\n")
+                    # If not in expected format, simply display raw content
+                    payoffs_text.append(f"- Raw payoffs data: {round_data['payoffs']}")
+            else:
+                # Other type cases
+                payoffs_text.append(f"- Payoffs data format not recognized: {type(round_data['payoffs'])}")
             
-            round_content.append("---\n")  # Add separator between rounds
-            markdown_content.extend(round_content)
-        
-        # Join all content and display
-        full_content = "\n".join(markdown_content)
-        
-        # Add copy button
-        st.download_button(
-            "Download as Markdown",
-            full_content,
-            file_name=f"game_log_{selected_log.replace('.json', '')}.md",
-            mime="text/markdown"
-        )
+            round_content.append("\n".join(payoffs_text) + "\n")
+
+        # Display reflections
+        if options["reflections"] and "reflections" in round_data:
+            round_content.append("### Reflections:")
+            for role, reflection in round_data["reflections"].items():
+                if not selected_players or role in selected_players:
+                    round_content.append(f"#### {role}'s reflection:")
+                    round_content.append(reflection + "\n")
         
-        # Display the markdown content
-        st.markdown(full_content)
+        round_content.append("---\n")  # Add separator between rounds
+        return "\n".join(round_content)
+
+    def write_markdown_export(self, path, rounds, options, selected_players, first_round=1):
+        """Stream rounds into a markdown file one at a time"""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for round_number, round_data in enumerate(rounds, start=first_round):
+                f.write(self.round_markdown(round_number, round_data, options, selected_players) + "\n")
+
+    def render_resume_game(self):
+        # Games cut off by a closed session or a failed request can continue from their last round
+        checkpoint_directory = self.controller.checkpoint_directory
+        checkpoints = list_checkpoints(checkpoint_directory) if checkpoint_directory else []
+        if not checkpoints:
+            return
+        
+        with st.expander(f"Resume an interrupted game ({len(checkpoints)})"):
+            selected = st.selectbox("Checkpoint", checkpoints)
+            if st.button("Resume Game"):
+                st.session_state.current_game_state = None
+                with st.spinner("Game in progress..."):
+                    try:
+                        game_state = self.controller.resume_game(os.path.join(checkpoint_directory, selected))
+                        st.session_state.current_game_state = game_state
+                        st.session_state.live_details = self.sink.details if self.live_view else None
+                    except Exception as e:
+                        st.error(f"Game execution error: {str(e)}")
 
     def run(self):
         st.title("LLM Game System")
@@ -348,10 +483,11 @@ class StreamlitGameApp:
                         role_obj = self.role_manager.add_temp_role(
                             name=role["name"],
                             behavior=original_role.behavior,
-                            llm_config={
+                            llm_config=None if role["provider"] == "strategy" else {
                                 "provider": role["provider"],
                                 "model": role["model"]
-                            }
+                            },
+                            strategy=role["model"] if role["provider"] == "strategy" else None
                         )
                         # Ensure role was created successfully
                         if role_obj:
@@ -369,15 +505,19 @@ class StreamlitGameApp:
                             try:
                                 game_state = self.controller.run_game("prisoner_dilemma", role_names)
                                 st.session_state.current_game_state = game_state
+                                st.session_state.live_details = self.sink.details if self.live_view else None
                             except Exception as e:
                                 st.error(f"Game execution error: {str(e)}")
                             finally:
                                 st.session_state.game_in_progress = False
             
+            self.render_resume_game()
+            
             # Show the current game state if a game is running or complete
             if st.session_state.current_game_state:
                 st.write("### Final Game Results")
                 self.render_game_status(st.session_state.current_game_state)
+                render_round_details(st.session_state.get('live_details'))
         
         with tab2:
             self.render_history_viewer()
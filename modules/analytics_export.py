@@ -0,0 +1,271 @@
+import json
+import os
+import re
+from datetime import datetime
+import pandas as pd
+from .logging_module import list_game_logs, iter_game_log, read_log_metadata
+from .strategies import cooperative_action, defecting_action
+from .checkpoint import write_json_atomic
+from .config_registry import get_registry
+
+LOG_ID_PATTERN = re.compile(r"^(.+)_\d{8}_\d{6}_")
+
+TABLES = ("games", "rounds", "actions", "payoffs", "token_usage")
+
+# Logs keep response text but not the provider's usage counts, so token usage
+# is estimated the way the rate limiter does it: 4 characters per token
+CHARS_PER_TOKEN = 4
+
+class AnalyticsExporter:
+    """Streams the game logs of a log directory into Parquet tables and builds reports from them.
+
+    Each table is a directory of part files under output_directory:
+    - games: one row per log (game, start time, players, rounds, final scores, winners)
+    - rounds: one row per round (cooperators, defectors, total payoff)
+    - actions: one row per player and round (action, cooperated, defected, valid, parse outcome)
+    - payoffs: one row per player and round (payoff, cumulative score)
+    - token_usage: one row per logged response (phase, characters, estimated tokens)
+
+    manifest.json records the size and mtime of every exported log and the
+    part it went to, so export() only reads new logs. A log that changed since
+    (e.g. a game that was still running) has its old rows dropped from that
+    part and is exported again. Logs are read one at a time and rows are
+    flushed to a new part every `chunk_size` logs, so memory stays bounded.
+    """
+
+    def __init__(self, log_directory='logs/', output_directory='analytics/', chunk_size=500):
+        self.log_directory = log_directory
+        self.output_directory = output_directory
+        self.chunk_size = chunk_size
+        self.manifest_path = os.path.join(output_directory, 'manifest.json')
+        self._game_actions = {}
+
+    @classmethod
+    def from_config(cls, config, output_directory=None):
+        """Build the exporter from config.json: log_directory and the 'analytics' block"""
+        analytics_config = config.get('analytics') or {}
+        return cls(
+            config.get('log_directory', 'logs/'),
+            output_directory or analytics_config.get('directory', 'analytics/'),
+            analytics_config.get('chunk_size', 500)
+        )
+
+    def _load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return {"next_part": 0, "logs": {}}
+        with open(self.manifest_path, 'r') as f:
+            return json.load(f)
+
+    def _table_dir(self, table):
+        return os.path.join(self.output_directory, table)
+
+    def _actions_for(self, game):
+        # Cooperative/defecting actions come from the game config, as in the strategy players
+        if game not in self._game_actions:
+            try:
+                self._game_actions[game] = get_registry().game(game).config.get('actions', [])
+            except (OSError, ValueError):
+                self._game_actions[game] = []
+        return self._game_actions[game]
+
+    def export(self):
+        """Export logs that are new or changed since the last run; returns counts per table"""
+        os.makedirs(self.output_directory, exist_ok=True)
+        manifest = self._load_manifest()
+        exported = manifest["logs"]
+
+        pending, stale = [], {}
+        for file in reversed(list_game_logs(self.log_directory)):
+            stat = os.stat(os.path.join(self.log_directory, file))
+            entry = exported.get(file)
+            if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+                continue
+            if entry:
+                stale.setdefault(entry["part"], []).append(os.path.splitext(file)[0])
+            pending.append((file, stat))
+
+        for part, log_ids in stale.items():
+            self._drop_rows(part, log_ids)
+
+        counts = {table: 0 for table in TABLES}
+        for start in range(0, len(pending), self.chunk_size):
+            chunk = pending[start:start + self.chunk_size]
+            columns = {table: {} for table in TABLES}
+            for file, _ in chunk:
+                self._read_log(file, columns)
+
+            part = f"part-{manifest['next_part']:05d}"
+            for table in TABLES:
+                frame = pd.DataFrame(columns[table])
+                counts[table] += len(frame)
+                if len(frame):
+                    os.makedirs(self._table_dir(table), exist_ok=True)
+                    frame.to_parquet(os.path.join(self._table_dir(table), f"{part}.parquet"), index=False)
+
+            for file, stat in chunk:
+                exported[file] = {"size": stat.st_size, "mtime": stat.st_mtime, "part": part}
+            manifest["next_part"] += 1
+            # Saved per chunk, so an interrupted export resumes after the last written part
+            write_json_atomic(self.manifest_path, manifest)
+
+        counts["logs"] = len(pending)
+        return counts
+
+    def _drop_rows(self, part, log_ids):
+        for table in TABLES:
+            path = os.path.join(self._table_dir(table), f"{part}.parquet")
+            if not os.path.exists(path):
+                continue
+            frame = pd.read_parquet(path)
+            frame = frame[~frame["log_id"].isin(log_ids)]
+            if len(frame):
+                frame.to_parquet(path, index=False)
+            else:
+                os.remove(path)
+
+    @staticmethod
+    def _append(columns, row):
+        for key, value in row.items():
+            columns.setdefault(key, []).append(value)
+
+    def _read_log(self, file, columns):
+        path = os.path.join(self.log_directory, file)
+        log_id = os.path.splitext(file)[0]
+        metadata = read_log_metadata(path)
+        # Log ids are "<game>_<date>_<time>_<n>"; logs without a header carry the game only there
+        match = LOG_ID_PATTERN.match(log_id)
+        game = metadata.get('game') or (match.group(1) if match else 'unknown')
+        actions_list = self._actions_for(game)
+        cooperate = cooperative_action(actions_list) if actions_list else None
+        defect = defecting_action(actions_list) if actions_list else None
+        models = {player['name']: self._player_model(player) for player in metadata.get('players', [])}
+
+        rounds, scores = 0, {}
+        for index, round_data in enumerate(iter_game_log(path), start=1):
+            round_number = round_data.get('round', index)
+            rounds = round_number
+            payoffs = round_data.get('payoffs', {})
+            scores = round_data.get('cumulative_scores', scores)
+            cooperators = defectors = 0
+
+            for player, data in round_data.get('actions', {}).items():
+                action = data.get('action') if isinstance(data, dict) else data
+                if actions_list:
+                    cooperated, defected = action == cooperate, action == defect
+                else:
+                    # Unknown game: fall back to the action-name convention of strategies.py
+                    cooperated = str(action).lower().startswith("cooperat")
+                    defected = str(action).lower().startswith("defect")
+                cooperators += cooperated
+                defectors += defected
+                model = models.get(player, 'unknown')
+                self._append(columns["actions"], {
+                    "log_id": log_id, "game": game, "round": round_number, "player": player, "model": model,
+                    "action": action, "cooperated": cooperated, "defected": defected,
+                    "valid": action in actions_list,
+                    # Local players are never parsed; logs before parse outcomes were recorded say 'unknown'
+                    "parse_outcome": (data.get('parse_outcome') or ('unknown' if 'raw_response' in data else 'local'))
+                    if isinstance(data, dict) else 'unknown'
+                })
+                self._append(columns["payoffs"], {
+                    "log_id": log_id, "game": game, "round": round_number, "player": player, "model": model,
+                    "payoff": float(payoffs.get(player, 0)), "cumulative_score": float(scores.get(player, 0))
+                })
+                if isinstance(data, dict) and data.get('raw_response') is not None:
+                    self._append_tokens(columns, log_id, game, round_number, player, model, 'action', data['raw_response'])
+
+            for player, reflection in (round_data.get('reflections') or {}).items():
+                if reflection:
+                    self._append_tokens(columns, log_id, game, round_number, player, models.get(player, 'unknown'),
+                                        'reflection', reflection)
+
+            self._append(columns["rounds"], {
+                "log_id": log_id, "game": game, "round": round_number, "cooperators": cooperators,
+                "defectors": defectors, "total_payoff": float(sum(payoffs.values()))
+            })
+
+        top = max(scores.values()) if scores else None
+        self._append(columns["games"], {
+            "log_id": log_id, "file": file, "game": game,
+            "started_at": metadata.get('started_at') or datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec='seconds'),
+            "players": json.dumps(list(models) or list(scores), ensure_ascii=False),
+            "models": json.dumps(models, ensure_ascii=False),
+            "rounds": rounds,
+            "scores": json.dumps(scores, ensure_ascii=False),
+            "winners": json.dumps([player for player, score in scores.items() if score == top], ensure_ascii=False)
+        })
+
+    @staticmethod
+    def _player_model(player):
+        """'provider/model' for LLM players, 'strategy:<name>' for local ones"""
+        if player.get('provider'):
+            return f"{player['provider']}/{player['model']}"
+        strategy = player.get('strategy')
+        if isinstance(strategy, dict):
+            strategy = strategy.get('name') or strategy.get('type')
+        return f"strategy:{strategy}" if strategy else 'unknown'
+
+    def _append_tokens(self, columns, log_id, game, round_number, player, model, phase, text):
+        self._append(columns["token_usage"], {
+            "log_id": log_id, "game": game, "round": round_number, "player": player, "model": model,
+            "phase": phase, "characters": len(text), "estimated_tokens": len(text) // CHARS_PER_TOKEN
+        })
+
+    def load(self, table, columns=None):
+        """Read an exported table (all parts) as a DataFrame; empty if nothing was exported yet"""
+        directory = self._table_dir(table)
+        if not os.path.isdir(directory) or not os.listdir(directory):
+            return pd.DataFrame(columns=columns or [])
+        return pd.read_parquet(directory, columns=columns)
+
+    def cooperation_rates(self, by="model"):
+        """Share of cooperative actions per game and `by` ('model', 'player' or a list of columns)"""
+        keys = ["game"] + ([by] if isinstance(by, str) else list(by))
+        actions = self.load("actions", columns=keys + ["log_id", "cooperated", "defected"])
+        if actions.empty:
+            return pd.DataFrame(columns=keys + ["games", "actions", "cooperation_rate", "defection_rate"])
+        return (
+            actions.groupby(keys)
+            .agg(games=("log_id", "nunique"), actions=("cooperated", "size"),
+                 cooperation_rate=("cooperated", "mean"), defection_rate=("defected", "mean"))
+            .reset_index()
+            .sort_values(keys)
+        )
+
+    def defection_curves(self, by="model"):
+        """Defection rate per round, one column per round, indexed by game and `by`"""
+        keys = ["game"] + ([by] if isinstance(by, str) else list(by))
+        actions = self.load("actions", columns=keys + ["round", "defected"])
+        if actions.empty:
+            return pd.DataFrame()
+        return actions.pivot_table(index=keys, columns="round", values="defected", aggfunc="mean")
+
+    def token_totals(self, by="model"):
+        """Estimated tokens of logged responses per game, `by` and phase"""
+        keys = ["game"] + ([by] if isinstance(by, str) else list(by))
+        usage = self.load("token_usage", columns=keys + ["phase", "estimated_tokens"])
+        if usage.empty:
+            return pd.DataFrame(columns=keys + ["phase", "responses", "estimated_tokens", "mean_tokens"])
+        return (
+            usage.groupby(keys + ["phase"])
+            .agg(responses=("estimated_tokens", "size"), estimated_tokens=("estimated_tokens", "sum"),
+                 mean_tokens=("estimated_tokens", "mean"))
+            .reset_index()
+        )
+
+    def write_reports(self):
+        """Write the aggregate reports as CSV files under <output_directory>/reports/; returns their paths"""
+        report_dir = os.path.join(self.output_directory, 'reports')
+        os.makedirs(report_dir, exist_ok=True)
+        reports = {
+            "cooperation_by_model.csv": self.cooperation_rates("model"),
+            "cooperation_by_role.csv": self.cooperation_rates("player"),
+            "defection_curve_by_model.csv": self.defection_curves("model"),
+            "token_usage_by_model.csv": self.token_totals("model")
+        }
+        paths = []
+        for name, frame in reports.items():
+            path = os.path.join(report_dir, name)
+            frame.to_csv(path, index=isinstance(frame.index, pd.MultiIndex))
+            paths.append(path)
+        return paths
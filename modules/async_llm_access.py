@@ -0,0 +1,106 @@
+import asyncio
+import os
+from .llm_access import build_completion_params
+from .mock_llm import AsyncMockLLMClient
+from .config_registry import get_registry
+from .response_parser import IncrementalActionParser
+from .rate_limiter import get_rate_limiter, estimate_tokens, next_retry_delay
+
+class AsyncLLMAccess:
+    """Awaitable counterpart of LLMAccess for running many games on one event loop.
+
+    Each provider gets a single AsyncOpenAI client backed by one pooled HTTP
+    connection pool, so concurrent requests reuse keep-alive connections instead
+    of spawning a thread and executor per call. Clients are bound to the event
+    loop they were first used on; call close() before that loop shuts down.
+    """
+
+    def __init__(self, providers_file='config/llm_providers.json', max_connections=20, max_keepalive_connections=10):
+        self.providers = self.load_providers(providers_file)
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.clients = {}
+
+    def load_providers(self, providers_file):
+        return get_registry().providers(providers_file)
+
+    def get_client(self, provider_name):
+        if provider_name not in self.clients:
+            provider_config = self.providers[provider_name]
+            if provider_config.get('type') == 'mock':
+                self.clients[provider_name] = AsyncMockLLMClient(provider_config)
+                return self.clients[provider_name]
+            # Imported on first use, as in LLMAccess.get_client
+            from openai import AsyncOpenAI
+            import httpx
+            api_key = os.getenv(provider_config['api_key_env'])
+            # Pool sizes can be tuned per provider in llm_providers.json
+            limits = httpx.Limits(
+                max_connections=provider_config.get('max_connections', self.max_connections),
+                max_keepalive_connections=provider_config.get('max_keepalive_connections', self.max_keepalive_connections)
+            )
+            self.clients[provider_name] = AsyncOpenAI(
+                api_key=api_key,
+                base_url=provider_config['base_url'],
+                # Retries are handled below so they share one policy with LLMAccess
+                max_retries=0,
+                http_client=httpx.AsyncClient(limits=limits)
+            )
+        return self.clients[provider_name]
+
+    async def send_request(self, prompt, provider_name, model, max_retries=5, retry_delay=2, max_retry_delay=60, timeout=120,
+                           stream=False, stop_on_action=False):
+        client = self.get_client(provider_name)
+        params = build_completion_params(prompt, model, self.providers[provider_name].get('structured_output', False))
+        # Same process-wide limiter as LLMAccess, so sync and async callers share the budget
+        limiter = get_rate_limiter(provider_name, self.providers[provider_name])
+        estimated_tokens = estimate_tokens(params)
+        retries = 0
+
+        while retries <= max_retries:
+            try:
+                await limiter.acquire_async(estimated_tokens)
+                if stream:
+                    return await self._consume_stream(client, params, timeout, stop_on_action)
+                response = await client.chat.completions.create(
+                    **params,
+                    timeout=timeout
+                )
+                usage = getattr(response, 'usage', None)
+                limiter.settle(estimated_tokens, getattr(usage, 'total_tokens', None))
+                return response.choices[0].message.content
+
+            except Exception as e:
+                retries += 1
+                if retries <= max_retries:
+                    delay = next_retry_delay(e, retries, limiter, retry_delay, max_retry_delay)
+                    print(f"API request failed (attempt {retries}/{max_retries}): {e}")
+                    print(f"Retrying after {delay:.1f} seconds...")
+                    await asyncio.sleep(delay)
+                else:
+                    print(f"API request failed, maximum retry attempts reached: {e}")
+                    return None
+
+    async def _consume_stream(self, client, params, timeout, stop_on_action):
+        parser = IncrementalActionParser()
+        response_stream = await client.chat.completions.create(**params, stream=True, timeout=timeout)
+        async for chunk in response_stream:
+            if not chunk.choices:
+                continue
+            if parser.feed(chunk.choices[0].delta.content) is not None and stop_on_action:
+                await response_stream.response.aclose()
+                break
+        return parser.text
+
+    async def send_many(self, requests, **kwargs):
+        """Send (prompt, provider, model) requests concurrently; responses keep request order"""
+        return await asyncio.gather(*[
+            self.send_request(prompt=prompt, provider_name=provider, model=model, **kwargs)
+            for prompt, provider, model in requests
+        ])
+
+    async def close(self):
+        """Close every provider's connection pool"""
+        for client in self.clients.values():
+            await client.close()
+        self.clients = {}
@@ -0,0 +1,207 @@
+import json
+import os
+import shutil
+import time
+import uuid
+from typing import Any, Dict
+from .llm_access import build_completion_params
+
+COMPLETIONS_URL = "/v1/chat/completions"
+TERMINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+def write_batch_input(path, requests):
+    """Write (custom_id, params) pairs as a batch input file, one chat completion request per line"""
+    with open(path, 'w') as f:
+        for custom_id, params in requests:
+            f.write(json.dumps({
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": COMPLETIONS_URL,
+                "body": params
+            }, ensure_ascii=False) + "\n")
+
+def read_batch_output(text):
+    """Map custom_id to completion text from a batch output file; failed requests map to None"""
+    results = {}
+    for line in text.splitlines():
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        response = entry.get("response") or {}
+        content = None
+        if not entry.get("error") and response.get("status_code") == 200:
+            content = response["body"]["choices"][0]["message"]["content"]
+        results[entry["custom_id"]] = content
+    return results
+
+class OpenAIBatchEndpoint:
+    """The provider's batch API: upload the input file, create a batch, poll it, download the output.
+
+    The pinned openai client has no batches resource, so /batches is called
+    through the client's generic post/get methods.
+    """
+
+    def __init__(self, client, completion_window="24h"):
+        self.client = client
+        self.completion_window = completion_window
+
+    def submit(self, input_path):
+        with open(input_path, 'rb') as f:
+            input_file = self.client.files.create(file=f, purpose="batch")
+        batch = self.client.post("/batches", body={
+            "input_file_id": input_file.id,
+            "endpoint": COMPLETIONS_URL,
+            "completion_window": self.completion_window
+        }, cast_to=Dict[str, Any])
+        return batch["id"]
+
+    def retrieve(self, batch_id):
+        return self.client.get(f"/batches/{batch_id}", cast_to=Dict[str, Any])
+
+    def download(self, file_id):
+        return self.client.files.retrieve_content(file_id)
+
+class LocalBatchEndpoint:
+    """File-based stand-in for a batch endpoint, for tests and offline runs.
+
+    Each batch is a directory holding input.jsonl, batch.json and, once done,
+    output.jsonl in the provider's output format. The requests are answered
+    through LLMAccess (e.g. the mock provider) when the batch is first polled.
+    """
+
+    def __init__(self, llm_access, provider_name, directory):
+        self.llm_access = llm_access
+        self.provider_name = provider_name
+        self.directory = directory
+
+    def _batch_dir(self, batch_id):
+        return os.path.join(self.directory, batch_id)
+
+    def _save(self, batch):
+        with open(os.path.join(self._batch_dir(batch["id"]), "batch.json"), 'w') as f:
+            json.dump(batch, f, indent=4)
+
+    def submit(self, input_path):
+        batch_id = f"batch_{uuid.uuid4().hex[:16]}"
+        os.makedirs(self._batch_dir(batch_id))
+        shutil.copyfile(input_path, os.path.join(self._batch_dir(batch_id), "input.jsonl"))
+        self._save({"id": batch_id, "status": "validating", "created_at": int(time.time()), "output_file_id": None})
+        return batch_id
+
+    def retrieve(self, batch_id):
+        with open(os.path.join(self._batch_dir(batch_id), "batch.json"), 'r') as f:
+            batch = json.load(f)
+        if batch["status"] not in TERMINAL_STATUSES:
+            batch = self._process(batch)
+        return batch
+
+    def _process(self, batch):
+        batch_dir = self._batch_dir(batch["id"])
+        output_path = os.path.join(batch_dir, "output.jsonl")
+        failed = 0
+        with open(os.path.join(batch_dir, "input.jsonl"), 'r') as source, open(output_path, 'w') as out:
+            for line in source:
+                request = json.loads(line)
+                body = request["body"]
+                content = self.llm_access.send_request(body["messages"], self.provider_name, body["model"])
+                if content is None:
+                    failed += 1
+                    entry = {"custom_id": request["custom_id"], "response": None,
+                             "error": {"code": "request_failed", "message": "No response after retries"}}
+                else:
+                    entry = {"custom_id": request["custom_id"], "error": None, "response": {
+                        "status_code": 200,
+                        "body": {"model": body["model"], "choices": [
+                            {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+                        ]}
+                    }}
+                out.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        batch.update(status="completed", output_file_id=output_path, request_counts={"failed": failed})
+        self._save(batch)
+        return batch
+
+    def download(self, file_id):
+        with open(file_id, 'r') as f:
+            return f.read()
+
+class BatchExecutor:
+    """Sends a wave of (messages, provider, model) requests as one batch job per provider.
+
+    Drop-in for RoundExecutor.send_all in offline runs: responses come back in
+    request order, None for requests the batch could not answer. The response
+    cache is consulted first, so only uncached requests are submitted.
+    endpoint is 'openai' (the provider's batch API) or 'local' (LocalBatchEndpoint);
+    mock providers always use the local endpoint.
+    """
+
+    def __init__(self, llm_access, endpoint='openai', directory='cache/batches', poll_interval=30,
+                 completion_window="24h"):
+        self.llm_access = llm_access
+        self.endpoint = endpoint
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self.completion_window = completion_window
+        self.endpoints = {}
+        os.makedirs(directory, exist_ok=True)
+
+    def endpoint_for(self, provider_name):
+        if provider_name not in self.endpoints:
+            provider = self.llm_access.providers[provider_name]
+            if self.endpoint == 'local' or provider.get('type') == 'mock':
+                self.endpoints[provider_name] = LocalBatchEndpoint(
+                    self.llm_access, provider_name, os.path.join(self.directory, 'local')
+                )
+            else:
+                self.endpoints[provider_name] = OpenAIBatchEndpoint(
+                    self.llm_access.get_client(provider_name), self.completion_window
+                )
+        return self.endpoints[provider_name]
+
+    def send_all(self, requests, wave_id=None):
+        wave_id = wave_id if wave_id is not None else uuid.uuid4().hex[:8]
+        cache = self.llm_access.response_cache
+        responses = [None] * len(requests)
+        cache_keys = {}
+        by_provider = {}
+        for index, (prompt, provider_name, model) in enumerate(requests):
+            params = build_completion_params(
+                prompt, model, self.llm_access.providers[provider_name].get('structured_output', False)
+            )
+            if cache:
+                cache_keys[index] = cache.make_key(provider_name, params)
+                cached = cache.get(cache_keys[index])
+                if cached is not None:
+                    responses[index] = cached
+                    continue
+                if cache.mode == 'replay':
+                    continue
+            by_provider.setdefault(provider_name, []).append((f"{wave_id}-{index}", params))
+
+        # Submit every provider's batch before waiting on any of them
+        pending = {}
+        for provider_name, provider_requests in by_provider.items():
+            input_path = os.path.join(self.directory, f"{wave_id}_{provider_name}.jsonl")
+            write_batch_input(input_path, provider_requests)
+            batch_id = self.endpoint_for(provider_name).submit(input_path)
+            print(f"Submitted batch {batch_id} with {len(provider_requests)} requests to {provider_name}")
+            pending[provider_name] = batch_id
+
+        while pending:
+            for provider_name, batch_id in list(pending.items()):
+                endpoint = self.endpoint_for(provider_name)
+                batch = endpoint.retrieve(batch_id)
+                if batch["status"] not in TERMINAL_STATUSES:
+                    continue
+                del pending[provider_name]
+                if batch["status"] != "completed" or not batch.get("output_file_id"):
+                    print(f"Batch {batch_id} for {provider_name} ended with status {batch['status']}")
+                    continue
+                for custom_id, content in read_batch_output(endpoint.download(batch["output_file_id"])).items():
+                    index = int(custom_id.rsplit("-", 1)[1])
+                    responses[index] = content
+                    if content is not None and index in cache_keys:
+                        prompt, _, model = requests[index]
+                        cache.put(cache_keys[index], provider_name, model, content)
+            if pending:
+                time.sleep(self.poll_interval)
+        return responses
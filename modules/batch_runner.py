@@ -0,0 +1,100 @@
+import itertools
+from .main_controller import MainController
+from .event_sink import EventSink
+
+class BatchRunner:
+    """Runs games headlessly: repeated matches or a round-robin over configured roles"""
+
+    def __init__(self, controller=None, sink=None, cache_mode=None):
+        # Batch mode defaults to the no-op sink so no UI work is done per round
+        self.controller = controller if controller else MainController(sink=sink if sink else EventSink(), cache_mode=cache_mode)
+        self.role_manager = self.controller.role_manager
+
+    def run_games(self, game_name, role_names, n_games=1):
+        """Play the same line-up n_games times"""
+        results = []
+        for match in range(n_games):
+            game_state = self.controller.run_game(game_name, role_names)
+            results.append(self._summarize(game_name, match, role_names, role_names, game_state))
+        return results
+
+    def run_round_robin(self, game_name, role_names=None, repetitions=1, self_play=False):
+        """Play every pair of roles (from config/roles.json by default) against each other"""
+        if role_names is None:
+            role_names = [role.name for role in self.role_manager.roles]
+
+        pairings = list(itertools.combinations(role_names, 2))
+        if self_play:
+            pairings += [(name, name) for name in role_names]
+
+        results = []
+        match = 0
+        for pairing in pairings:
+            player_names = self._seat_players(pairing)
+            for _ in range(repetitions):
+                game_state = self.controller.run_game(game_name, player_names)
+                results.append(self._summarize(game_name, match, pairing, player_names, game_state))
+                match += 1
+        return results
+
+    def _seat_players(self, pairing):
+        """Player names must be unique within a game, so mirrored roles get numbered copies"""
+        if len(set(pairing)) == len(pairing):
+            return list(pairing)
+
+        player_names = []
+        for seat, role_name in enumerate(pairing, start=1):
+            role = self.role_manager.get_role(role_name)
+            if role is None:
+                raise ValueError(f"Role not found: {role_name}")
+            seat_name = f"{role_name} #{seat}"
+            self.role_manager.add_temp_role(
+                seat_name, role.behavior, dict(role.llm_config) if role.llm_config else None, role.strategy
+            )
+            player_names.append(seat_name)
+        return player_names
+
+    def _summarize(self, game_name, match, role_names, player_names, game_state):
+        scores = game_state["cumulative_scores"]
+        max_score = max(scores.values())
+        return {
+            "game": game_name,
+            "match": match,
+            "roles": dict(zip(player_names, role_names)),
+            "rounds": game_state["round"],
+            "cumulative_scores": dict(scores),
+            "winners": [player for player, score in scores.items() if score == max_score],
+            "parse_outcomes": dict(game_state.get("parse_outcomes", {}))
+        }
+
+    def cache_stats(self):
+        """Hit/miss counters of the response cache, or None when caching is off"""
+        cache = self.controller.llm_access.response_cache
+        return cache.stats() if cache else None
+
+    @staticmethod
+    def parse_stats(results):
+        """ParseOutcome counts summed over match results"""
+        totals = {}
+        for result in results:
+            for outcome, count in result.get("parse_outcomes", {}).items():
+                totals[outcome] = totals.get(outcome, 0) + count
+        return totals
+
+    @staticmethod
+    def standings(results):
+        """Aggregate match results per role: games, wins, total and average score"""
+        table = {}
+        for result in results:
+            # Failed tournament jobs carry an error instead of scores
+            if "error" in result:
+                continue
+            for player, role_name in result["roles"].items():
+                row = table.setdefault(role_name, {"games": 0, "wins": 0, "total_score": 0})
+                row["games"] += 1
+                row["total_score"] += result["cumulative_scores"][player]
+                if player in result["winners"]:
+                    row["wins"] += 1
+        for row in table.values():
+            row["average_score"] = row["total_score"] / row["games"]
+        return table
@@ -0,0 +1,27 @@
+import json
+import os
+
+def write_json_atomic(path, data):
+    """Write JSON to a temporary file and rename it over `path`, so a crash never leaves a half-written file"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(data, f, ensure_ascii=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def read_checkpoint(path):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def remove_checkpoint(path):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+def list_checkpoints(directory):
+    """Checkpoint files of unfinished games in `directory`, newest first"""
+    if not os.path.isdir(directory):
+        return []
+    files = [f for f in os.listdir(directory) if f.endswith('.json')]
+    return sorted(files, key=lambda f: os.path.getmtime(os.path.join(directory, f)), reverse=True)
@@ -1,12 +1,12 @@
-import json
+from .config_registry import get_registry
 
 class ConfigManager:
     def __init__(self, config_file='config/config.json'):
         self.config = self.load_config(config_file)
 
     def load_config(self, config_file):
-        with open(config_file, 'r') as f:
-            return json.load(f)
+        # Parsed once per process; copied so set_config only affects this manager
+        return dict(get_registry().app_config(config_file))
 
     def get_config(self, key):
         return self.config.get(key)
@@ -0,0 +1,116 @@
+import json
+import os
+import threading
+from .payoff_engine import PayoffTable
+
+CONFIG_DIRECTORY = 'config'
+
+class GameDefinition:
+    """A parsed config/games/<name>.json with its compiled payoff table"""
+
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.payoff_table = PayoffTable.from_game_config(config)
+
+def _validate_app_config(path, data):
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object")
+    return data
+
+def _validate_providers(path, data):
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected a JSON object of providers")
+    for name, provider in data.items():
+        if provider.get('type') == 'mock':
+            continue
+        missing = [key for key in ('base_url', 'api_key_env') if key not in provider]
+        if missing:
+            raise ValueError(f"{path}: provider '{name}' is missing {missing}")
+    return data
+
+def _validate_roles(path, data):
+    if not isinstance(data, list):
+        raise ValueError(f"{path}: expected a JSON list of roles")
+    for index, role in enumerate(data):
+        missing = [key for key in ('name', 'behavior') if key not in role]
+        if missing:
+            raise ValueError(f"{path}: role {index} is missing {missing}")
+        if role.get('llm_config') is None and role.get('strategy') is None:
+            raise ValueError(f"{path}: role '{role['name']}' needs an llm_config or a strategy")
+    return data
+
+def _parse_game(path, data):
+    missing = [key for key in ('actions', 'payoff', 'rules') if key not in data]
+    if missing:
+        raise ValueError(f"{path}: game is missing {missing}")
+    # Compiling the payoff table also checks every payoff entry against the actions
+    return GameDefinition(os.path.splitext(os.path.basename(path))[0], data)
+
+class ConfigRegistry:
+    """Process-wide cache of the parsed and validated config/*.json files.
+
+    Each file is read, parsed and validated (for games, also compiled into a
+    PayoffTable) once. Later lookups cost one os.stat, and the file is loaded
+    again only when its mtime or size changed, so edits are picked up without
+    restarting while Streamlit reruns and tournament games reuse the parsed
+    objects. `version` counts reloads, for callers that cache objects built
+    from the config.
+
+    The returned objects are shared; callers that modify them must copy first.
+    """
+
+    def __init__(self, config_directory=CONFIG_DIRECTORY):
+        self.config_directory = config_directory
+        self.version = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def load(self, path, parse=None):
+        """Parsed contents of a JSON file; parse(path, data) converts and validates it"""
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (path, parse)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == stamp:
+                return entry[1]
+        with open(path, 'r') as f:
+            data = json.load(f)
+        value = parse(path, data) if parse else data
+        with self._lock:
+            if key in self._entries:
+                self.version += 1
+            self._entries[key] = (stamp, value)
+        return value
+
+    def _path(self, name):
+        return os.path.join(self.config_directory, name)
+
+    def app_config(self, path=None):
+        return self.load(path or self._path('config.json'), _validate_app_config)
+
+    def providers(self, path=None):
+        return self.load(path or self._path('llm_providers.json'), _validate_providers)
+
+    def roles(self, path=None):
+        return self.load(path or self._path('roles.json'), _validate_roles)
+
+    def game(self, game_name):
+        return self.load(self._path(os.path.join('games', f'{game_name}.json')), _parse_game)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.version += 1
+
+_registry = None
+_registry_lock = threading.Lock()
+
+def get_registry():
+    """The process-wide ConfigRegistry (config paths are relative to the working directory)"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ConfigRegistry()
+        return _registry
@@ -0,0 +1,71 @@
+class EventSink:
+    """Receives game events from the engine; this base class ignores all of them.
+
+    MainController, GameRules, PromptGenerator and ResponseParser report what
+    they are doing through a sink instead of calling a UI directly, so the same
+    engine runs inside Streamlit or headless. Batch runs use this no-op sink.
+    """
+
+    def game_started(self, game_name, game_rules, role_names, temp_role_names):
+        pass
+
+    def role_loaded(self, role):
+        pass
+
+    def round_started(self, round_number):
+        pass
+
+    def phase_started(self, phase):
+        """phase is 'action' or 'reflection'"""
+        pass
+
+    def prompt_created(self, role, prompt, phase):
+        """prompt is a list of chat messages ({"role", "content"})"""
+        pass
+
+    def response_received(self, role, response, phase):
+        pass
+
+    def action_chosen(self, role, action):
+        pass
+
+    def round_results(self, actions, payoffs, cumulative_scores):
+        pass
+
+    def reflection_received(self, role, reflection):
+        pass
+
+    def round_completed(self, game_state):
+        pass
+
+    def game_over(self, cumulative_scores, winners):
+        pass
+
+    def debug(self, message):
+        pass
+
+    def warning(self, message):
+        pass
+
+    def error(self, message):
+        pass
+
+
+class ConsoleEventSink(EventSink):
+    """Prints a one-line summary per round, for command-line runs"""
+
+    def game_started(self, game_name, game_rules, role_names, temp_role_names):
+        print(f"Starting {game_name}: {', '.join(role_names)}")
+
+    def round_results(self, actions, payoffs, cumulative_scores):
+        choices = ", ".join(f"{player}={data['action']}" for player, data in actions.items())
+        print(f"  {choices} -> {payoffs} (total {cumulative_scores})")
+
+    def game_over(self, cumulative_scores, winners):
+        print(f"Game over: {cumulative_scores}, winner(s): {', '.join(winners)}")
+
+    def warning(self, message):
+        print(f"Warning: {message}")
+
+    def error(self, message):
+        print(f"Error: {message}")
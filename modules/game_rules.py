@@ -1,27 +1,30 @@
-import json
-import streamlit as st
+from .event_sink import EventSink
+from .config_registry import get_registry, GameDefinition
 
 class GameRules:
-    def __init__(self, game_name):
+    def __init__(self, game_name, sink=None):
         self.game_name = game_name
-        self.game_config = self.load_game(game_name)
+        self.sink = sink if sink else EventSink()
+        definition = self.load_game(game_name)
+        self.game_config = definition.config
         self.rules = self.game_config['rules']
+        # Compiled once per process (and game file version) by the config registry
+        self.payoff_table = definition.payoff_table
         print(f"Game rules loaded for: {game_name}")
         
     def load_game(self, game_name):
         try:
-            with open(f'config/games/{game_name}.json', 'r') as f:
-                return json.load(f)
+            return get_registry().game(game_name)
         except Exception as e:
-            st.error(f"Error loading game configuration: {e}")
+            self.sink.error(f"Error loading game configuration: {e}")
             print(f"Error loading game configuration: {e}")
-            return {
+            return GameDefinition("default", {
                 "name": "Default Game",
                 "actions": ["Cooperate", "Defect"],
                 "payoff": {"Cooperate,Cooperate": [3, 3]},
                 "max_rounds": 3,
                 "rules": "Default rules"
-            }
+            })
 
     def get_actions(self):
         """Return available actions as dict with descriptions"""
@@ -37,7 +40,7 @@ class GameRules:
         """Calculate payoffs based on player actions"""
         try:
             # Debug
-            st.write(f"Debug - Calculating payoff for: {actions}")
+            self.sink.debug(f"Debug - Calculating payoff for: {actions}")
             print(f"Calculating payoff for: {actions}")
             
             # Extract action values from player-action dict
@@ -53,15 +56,16 @@ class GameRules:
                 # If actions is already a list
                 action_values = actions
             
-            # Normalize actions to match config case
-            normalized_actions = [action.capitalize() for action in action_values]
-            key = ','.join(normalized_actions)
-            
-            st.write(f"Debug - Lookup key: {key}")
-            print(f"Lookup key: {key}")
-            
-            # Get payoffs from config
-            payoffs = self.game_config['payoff'].get(key, [0, 0])
+            # Look the profile up in the compiled payoff tensor
+            payoffs = None
+            try:
+                payoffs = self.payoff_table.payoff(action_values)
+            except KeyError as e:
+                self.sink.warning(e.args[0])
+            if payoffs is None:
+                # A miss used to score 0 silently
+                self.sink.warning(f"No payoff defined for actions {action_values}; scoring this round as 0 for everyone")
+                payoffs = [0] * len(action_values)
             
             # Map payoffs to player names
             if isinstance(actions, dict):
@@ -69,7 +73,7 @@ class GameRules:
                 if len(player_names) == len(payoffs):
                     return {player_names[i]: payoffs[i] for i in range(len(player_names))}
                 else:
-                    st.warning(f"Payoff length {len(payoffs)} doesn't match players {len(player_names)}")
+                    self.sink.warning(f"Payoff length {len(payoffs)} doesn't match players {len(player_names)}")
                     # If lengths don't match, assign whatever we can
                     result = {}
                     for i in range(min(len(player_names), len(payoffs))):
@@ -80,10 +84,14 @@ class GameRules:
                 return payoffs
             
         except Exception as e:
-            st.error(f"Error calculating payoff: {e}")
+            self.sink.error(f"Error calculating payoff: {e}")
             print(f"Error calculating payoff: {e}")
             return {player: 0 for player in actions.keys()} if isinstance(actions, dict) else [0] * len(actions)
 
+    def evaluate_profiles(self, profiles):
+        """Batched payoffs for an array of action-id profiles, shape (..., n_players)"""
+        return self.payoff_table.evaluate(profiles)
+
     def is_game_over(self, state):
         """Determine if the game is over based on current state"""
         max_rounds = self.game_config.get('max_rounds', 3)
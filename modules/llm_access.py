@@ -1,67 +1,152 @@
-from openai import OpenAI
 import os
-import json
 import time
-import concurrent.futures
+import threading
+import contextlib
+from .mock_llm import MockLLMClient
+from .config_registry import get_registry
+from .response_parser import IncrementalActionParser
+from .rate_limiter import get_rate_limiter, estimate_tokens, next_retry_delay
+
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "Reply with a single JSON object instead of tags: put the content of the Action tag under "
+    "the key \"action\" and the content of the Reflection tag under the key \"reflection\", "
+    "including only the keys that were asked for."
+)
+
+def build_completion_params(prompt, model, structured_output=False):
+    """Chat completion arguments shared by the sync and async clients.
+
+    prompt is either a string or a list of chat messages (system prefix + user suffix).
+    With structured_output (set per provider in llm_providers.json) the model is
+    asked for a JSON object, which ResponseParser reads without any tag matching.
+    """
+    messages = prompt if isinstance(prompt, list) else [{"role": "user", "content": prompt}]
+    # Batch requests answered through send_request already carry the instruction
+    if structured_output and messages[-1]['content'] != STRUCTURED_OUTPUT_INSTRUCTION:
+        messages = messages + [{"role": "user", "content": STRUCTURED_OUTPUT_INSTRUCTION}]
+    if not model.startswith("o"):
+        params = {
+            "model": model,
+            "messages": messages,
+            "temperature": 0.6,
+            "max_tokens": 1500
+        }
+        if structured_output:
+            params["response_format"] = {"type": "json_object"}
+        return params
+    print("Using o1 or o3")
+    # Some reasoning models reject system messages; one user message keeps the same cacheable prefix
+    if len(messages) > 1:
+        messages = [{"role": "user", "content": "\n".join(message['content'] for message in messages)}]
+    return {
+        "model": model,
+        "messages": messages,
+        "max_completion_tokens": 2500
+    }
 
 class LLMAccess:
-    def __init__(self, providers_file='config/llm_providers.json'):
+    def __init__(self, providers_file='config/llm_providers.json', request_semaphore=None, response_cache=None):
         self.providers = self.load_providers(providers_file)
         self.clients = {}
+        # Optional semaphore shared across threads or processes to cap in-flight requests
+        self.request_semaphore = request_semaphore
+        # Optional ResponseCache; None means every request goes to the network
+        self.response_cache = response_cache
+        # Requests of one round run on several threads at once
+        self._clients_lock = threading.Lock()
 
     def load_providers(self, providers_file):
-        with open(providers_file, 'r') as f:
-            return json.load(f)
+        return get_registry().providers(providers_file)
 
     def get_client(self, provider_name):
-        if (provider_name not in self.clients):
-            provider_config = self.providers[provider_name]
-            api_key = os.getenv(provider_config['api_key_env'])
-            self.clients[provider_name] = OpenAI(
-                api_key=api_key,
-                base_url=provider_config['base_url']
-            )
-        return self.clients[provider_name]
+        with self._clients_lock:
+            if (provider_name not in self.clients):
+                provider_config = self.providers[provider_name]
+                if provider_config.get('type') == 'mock':
+                    # Local scripted provider, no network or API key involved
+                    self.clients[provider_name] = MockLLMClient(provider_config)
+                    return self.clients[provider_name]
+                # Imported on first use: openai takes longer to import than the whole engine,
+                # and runs against mock providers never need it
+                from openai import OpenAI
+                api_key = os.getenv(provider_config['api_key_env'])
+                self.clients[provider_name] = OpenAI(
+                    api_key=api_key,
+                    base_url=provider_config['base_url'],
+                    # send_request owns the retry policy (backoff, Retry-After, shared limiter)
+                    max_retries=0
+                )
+            return self.clients[provider_name]
+
+    def send_request(self, prompt, provider_name, model, max_retries=5, retry_delay=2, max_retry_delay=60, timeout=120,
+                     stream=False, stop_on_action=False):
+        """Return the completion text, or None once retries are exhausted.
+
+        With stream=True tokens are consumed as they arrive; stop_on_action also
+        cancels the generation as soon as '</Action>' has been received, so the
+        returned text ends at the action tag.
+        """
+        params = build_completion_params(prompt, model, self.providers[provider_name].get('structured_output', False))
+
+        cache_key = None
+        if self.response_cache:
+            # Truncated streamed responses must not be served to callers wanting the full text
+            key_params = dict(params, stop_on_action=True) if stream and stop_on_action else params
+            cache_key = self.response_cache.make_key(provider_name, key_params)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                return cached
+            if self.response_cache.mode == 'replay':
+                print(f"Cache miss in replay mode for {provider_name}/{model}, no request sent")
+                return None
 
-    def send_request(self, prompt, provider_name, model, max_retries=5, retry_delay=10, timeout=120):
         client = self.get_client(provider_name)
+        # Shared by every LLMAccess in the process so concurrent games split one budget
+        limiter = get_rate_limiter(provider_name, self.providers[provider_name])
+        estimated_tokens = estimate_tokens(params)
         retries = 0
         
         while retries <= max_retries:
             try:
-                # 使用concurrent.futures来实现超时机制
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    if not model.startswith("o"):
-                        future = executor.submit(
-                            client.chat.completions.create,
-                            model=model,
-                            messages=[{"role": "user", "content": prompt}],
-                            temperature=0.6,
-                            max_tokens=1500
-                        )
+                limiter.acquire(estimated_tokens)
+                # The client enforces the timeout itself, no executor needed per request
+                with self.request_semaphore if self.request_semaphore else contextlib.nullcontext():
+                    if stream:
+                        # Streams report no usage, so the estimate stands
+                        content = self._consume_stream(client, params, timeout, stop_on_action)
                     else:
-                        print("Using o1 or o3")
-                        future = executor.submit(
-                            client.chat.completions.create,
-                            model=model,
-                            messages=[{"role": "user", "content": prompt}],
-                            max_completion_tokens=2500
+                        response = client.chat.completions.create(
+                            **params,
+                            timeout=timeout
                         )
-                    
-                    try:
-                        response = future.result(timeout=timeout)
-                        print('-'*10,'\n',response.choices[0].message.content,'\n','-'*10)
-                        return response.choices[0].message.content
-                    except concurrent.futures.TimeoutError:
-                        # 请求超时
-                        raise TimeoutError(f"Request timed out after {timeout} seconds")
+                        usage = getattr(response, 'usage', None)
+                        limiter.settle(estimated_tokens, getattr(usage, 'total_tokens', None))
+                        content = response.choices[0].message.content
+                print('-'*10,'\n',content,'\n','-'*10)
+                if cache_key:
+                    self.response_cache.put(cache_key, provider_name, model, content)
+                return content
                         
             except Exception as e:
                 retries += 1
                 if retries <= max_retries:
+                    delay = next_retry_delay(e, retries, limiter, retry_delay, max_retry_delay)
                     print(f"API request failed (attempt {retries}/{max_retries}): {e}")
-                    print(f"Retrying after {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                    print(f"Retrying after {delay:.1f} seconds...")
+                    time.sleep(delay)
                 else:
                     print(f"API request failed, maximum retry attempts reached: {e}")
-                    return None
\ No newline at end of file
+                    return None
+
+
+    def _consume_stream(self, client, params, timeout, stop_on_action):
+        parser = IncrementalActionParser()
+        response_stream = client.chat.completions.create(**params, stream=True, timeout=timeout)
+        for chunk in response_stream:
+            if not chunk.choices:
+                continue
+            if parser.feed(chunk.choices[0].delta.content) is not None and stop_on_action:
+                # Closing the connection cancels the rest of the generation
+                response_stream.response.close()
+                break
+        return parser.text
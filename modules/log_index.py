@@ -0,0 +1,202 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from .logging_module import list_game_logs, iter_game_log, read_log_metadata
+
+class LogIndex:
+    """SQLite index over the game logs, kept up to date by LoggingModule as rounds are written.
+
+    Tables:
+    - games: one row per log (game, start time, players, rounds so far, latest
+      cumulative scores, winners once finished)
+    - game_players: one row per player of a game, for filtering by player or model
+    - rounds: one row per round with the full round record
+
+    The viewers page through games and rounds with queries instead of listing
+    and parsing every log file. Logs written before the index existed are added
+    by sync().
+    """
+
+    def __init__(self, path='logs/index.sqlite'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @classmethod
+    def from_config(cls, index_config, log_directory):
+        """Build the index from the 'log_index' config block; returns None when it is disabled"""
+        index_config = index_config or {}
+        if not index_config.get('enabled', True):
+            return None
+        return cls(index_config.get('path') or os.path.join(log_directory, 'index.sqlite'))
+
+    def _connection(self):
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            # Tournament workers write concurrently; WAL lets the viewers read meanwhile
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS games ("
+                "log_id TEXT PRIMARY KEY, file TEXT, game TEXT, started_at TEXT, updated_at REAL, "
+                "rounds INTEGER DEFAULT 0, finished INTEGER DEFAULT 0, players TEXT, scores TEXT, winners TEXT);"
+                "CREATE INDEX IF NOT EXISTS idx_games_started ON games(started_at);"
+                "CREATE TABLE IF NOT EXISTS game_players ("
+                "log_id TEXT, name TEXT, provider TEXT, model TEXT, strategy TEXT, PRIMARY KEY (log_id, name));"
+                "CREATE INDEX IF NOT EXISTS idx_players_name ON game_players(name);"
+                "CREATE INDEX IF NOT EXISTS idx_players_model ON game_players(model);"
+                "CREATE TABLE IF NOT EXISTS rounds ("
+                "log_id TEXT, round INTEGER, data TEXT, PRIMARY KEY (log_id, round));"
+            )
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def start_game(self, log_id, file, metadata=None):
+        metadata = metadata or {}
+        players = metadata.get('players', [])
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO games (log_id, file, game, started_at, updated_at, rounds, finished, players, scores, winners) "
+                "VALUES (?, ?, ?, ?, ?, 0, 0, ?, '{}', '[]')",
+                (log_id, file, metadata.get('game'), metadata.get('started_at'), time.time(),
+                 json.dumps([player['name'] for player in players], ensure_ascii=False))
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO game_players (log_id, name, provider, model, strategy) VALUES (?, ?, ?, ?, ?)",
+                [
+                    (log_id, player['name'], player.get('provider'), player.get('model'),
+                     json.dumps(player['strategy'], ensure_ascii=False) if player.get('strategy') is not None else None)
+                    for player in players
+                ]
+            )
+            conn.commit()
+
+    def add_round(self, log_id, round_data):
+        with self._lock:
+            conn = self._connection()
+            round_number = round_data.get('round')
+            conn.execute(
+                "INSERT OR REPLACE INTO rounds (log_id, round, data) VALUES (?, ?, ?)",
+                (log_id, round_number, json.dumps(round_data, ensure_ascii=False, separators=(',', ':')))
+            )
+            conn.execute(
+                "UPDATE games SET rounds = ?, scores = ?, updated_at = ? WHERE log_id = ?",
+                (round_number, json.dumps(round_data.get('cumulative_scores', {}), ensure_ascii=False), time.time(), log_id)
+            )
+            conn.commit()
+
+    def finish_game(self, log_id):
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT scores FROM games WHERE log_id = ?", (log_id,)).fetchone()
+            scores = json.loads(row[0]) if row and row[0] else {}
+            winners = [player for player, score in scores.items() if score == max(scores.values())] if scores else []
+            conn.execute(
+                "UPDATE games SET finished = 1, winners = ?, updated_at = ? WHERE log_id = ?",
+                (json.dumps(winners, ensure_ascii=False), time.time(), log_id)
+            )
+            conn.commit()
+
+    def _filters(self, game=None, player=None, model=None, finished=None):
+        clauses, params = [], []
+        if game:
+            clauses.append("game = ?")
+            params.append(game)
+        if player:
+            clauses.append("log_id IN (SELECT log_id FROM game_players WHERE name LIKE ?)")
+            params.append(f"%{player}%")
+        if model:
+            clauses.append("log_id IN (SELECT log_id FROM game_players WHERE model LIKE ? OR provider LIKE ?)")
+            params.extend([f"%{model}%", f"%{model}%"])
+        if finished is not None:
+            clauses.append("finished = ?")
+            params.append(1 if finished else 0)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count_games(self, **filters):
+        where, params = self._filters(**filters)
+        with self._lock:
+            return self._connection().execute(f"SELECT COUNT(*) FROM games{where}", params).fetchone()[0]
+
+    def query_games(self, limit=50, offset=0, **filters):
+        """One page of games, newest first; filters: game, player, model (substring), finished"""
+        where, params = self._filters(**filters)
+        return self._select_games(f"{where} ORDER BY started_at DESC, updated_at DESC LIMIT ? OFFSET ?", params + [limit, offset])
+
+    def get_game(self, log_id):
+        games = self._select_games(" WHERE log_id = ?", [log_id])
+        return games[0] if games else None
+
+    def _select_games(self, clause, params):
+        with self._lock:
+            conn = self._connection()
+            rows = conn.execute(
+                f"SELECT log_id, file, game, started_at, rounds, finished, players, scores, winners FROM games{clause}",
+                params
+            ).fetchall()
+            models = {}
+            if rows:
+                placeholders = ",".join("?" * len(rows))
+                for log_id, name, provider, model in conn.execute(
+                    f"SELECT log_id, name, provider, model FROM game_players WHERE log_id IN ({placeholders})",
+                    [row[0] for row in rows]
+                ):
+                    models.setdefault(log_id, {})[name] = f"{provider}/{model}" if provider else None
+        return [
+            {
+                "log_id": log_id, "file": file, "game": game, "started_at": started_at, "rounds": rounds,
+                "finished": bool(finished), "players": json.loads(players or '[]'), "models": models.get(log_id, {}),
+                "scores": json.loads(scores or '{}'), "winners": json.loads(winners or '[]')
+            }
+            for log_id, file, game, started_at, rounds, finished, players, scores, winners in rows
+        ]
+
+    def get_rounds(self, log_id, start=1, end=None):
+        """Round records start..end (1-based, inclusive) of one game"""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT data FROM rounds WHERE log_id = ? AND round >= ? AND round <= ? ORDER BY round",
+                (log_id, start, end if end is not None else 2 ** 31)
+            ).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def games_list(self):
+        with self._lock:
+            return [row[0] for row in self._connection().execute("SELECT DISTINCT game FROM games ORDER BY game")]
+
+    def sync(self, log_directory):
+        """Index log files the index does not know yet (e.g. written before it existed); returns how many"""
+        with self._lock:
+            known = {row[0] for row in self._connection().execute("SELECT file FROM games")}
+        added = 0
+        for file in list_game_logs(log_directory):
+            if file in known:
+                continue
+            path = os.path.join(log_directory, file)
+            log_id = os.path.splitext(file)[0]
+            metadata = read_log_metadata(path)
+            if not metadata.get('started_at'):
+                metadata['started_at'] = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(os.path.getmtime(path)))
+            rounds = list(iter_game_log(path))
+            if 'players' not in metadata and rounds:
+                metadata['players'] = [{"name": name} for name in rounds[0].get('actions', {})]
+            self.start_game(log_id, file, metadata)
+            for index, round_data in enumerate(rounds, start=1):
+                self.add_round(log_id, dict(round_data, round=round_data.get('round', index)))
+            self.finish_game(log_id)
+            added += 1
+        return added
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
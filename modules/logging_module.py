@@ -2,21 +2,60 @@ import json
 import os
 import datetime
 
+LOG_EXTENSIONS = {'json': '.json', 'jsonl': '.jsonl'}
+
 class LoggingModule:
-    def __init__(self, log_directory='logs/'):
+    def __init__(self, log_directory='logs/', log_format='jsonl', index=None):
         self.log_directory = log_directory
+        # Optional LogIndex updated alongside every write, for the viewers
+        self.index = index
+        # 'jsonl' appends one compact line per round; 'json' is the legacy rewritten array
+        self.log_format = log_format if log_format in LOG_EXTENSIONS else 'jsonl'
         if not os.path.exists(log_directory):
             os.makedirs(log_directory)
 
-    def start_game_log(self, game_name):
+    def start_game_log(self, game_name, metadata=None):
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        extension = LOG_EXTENSIONS[self.log_format]
         log_id = f"{game_name}_{timestamp}_{id(self)}"
-        self.current_log = os.path.join(self.log_directory, f"{log_id}.json")
+        # Batch runs can start several games within the same second
+        if os.path.exists(os.path.join(self.log_directory, f"{log_id}{extension}")):
+            suffix = 2
+            while os.path.exists(os.path.join(self.log_directory, f"{log_id}_{suffix}{extension}")):
+                suffix += 1
+            log_id = f"{log_id}_{suffix}"
+        self.current_log = os.path.join(self.log_directory, f"{log_id}{extension}")
         with open(self.current_log, 'w') as f:
-            json.dump([], f, ensure_ascii=False, indent=4)
+            if self.log_format == 'jsonl':
+                # Optional header line describing the game; readers skip it when listing rounds
+                if metadata:
+                    f.write(json.dumps({"_meta": metadata}, ensure_ascii=False) + "\n")
+            else:
+                json.dump([], f, ensure_ascii=False, indent=4)
+        self.current_log_id = log_id
+        if self.index:
+            self.index.start_game(log_id, os.path.basename(self.current_log), metadata)
         return log_id
 
+    def resume_game_log(self, log_path):
+        """Append further rounds to an existing log, e.g. when a checkpointed game is resumed"""
+        self.current_log = log_path
+        extension = os.path.splitext(log_path)[1]
+        self.log_format = 'json' if extension == LOG_EXTENSIONS['json'] else 'jsonl'
+        self.current_log_id = os.path.splitext(os.path.basename(log_path))[0]
+        return self.current_log_id
+
     def log_round(self, round_data):
+        if self.index:
+            self.index.add_round(self.current_log_id, round_data)
+
+        if self.log_format == 'jsonl':
+            # One append per round: constant cost, and a crash can only lose the last line
+            with open(self.current_log, 'a') as f:
+                f.write(json.dumps(round_data, ensure_ascii=False, separators=(',', ':')) + "\n")
+                f.flush()
+            return
+
         with open(self.current_log, 'r+') as f:
             logs = json.load(f)
             logs.append(round_data)
@@ -24,4 +63,118 @@ class LoggingModule:
             json.dump(logs, f, ensure_ascii=False, indent=4)
 
     def save_log(self):
-        print(f"Saving log: {self.current_log}")
\ No newline at end of file
+        if self.index:
+            self.index.finish_game(self.current_log_id)
+        print(f"Saving log: {self.current_log}")
+
+def list_game_logs(log_directory):
+    """File names of game logs in either format, newest first"""
+    log_files = [f for f in os.listdir(log_directory) if os.path.splitext(f)[1] in LOG_EXTENSIONS.values()]
+    return sorted(log_files, key=lambda f: os.path.getmtime(os.path.join(log_directory, f)), reverse=True)
+
+def iter_game_log(path):
+    """Yield the rounds of a legacy JSON array log or a JSON Lines log"""
+    if path.endswith(LOG_EXTENSIONS['json']):
+        with open(path, 'r') as f:
+            yield from json.load(f)
+        return
+
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash mid-write leaves at most one truncated trailing line
+                print(f"Skipping unreadable line in {path}")
+                continue
+            if "_meta" in record:
+                continue
+            yield record
+
+class GameLogReader:
+    """Reads rounds of one log on demand, for viewers that page through large logs.
+
+    For JSON Lines logs the byte offset of every round line is recorded on the
+    first scan (without parsing the lines), so a page of rounds is read by
+    seeking to its first line and parsing only the rounds it holds. Logs are
+    append-only, so when the file has grown only the new tail is scanned.
+    Legacy JSON array logs cannot be read partially and are loaded whole.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._offsets = []
+        self._scanned = 0
+        self._legacy_rounds = None
+
+    def _refresh(self):
+        if self.path.endswith(LOG_EXTENSIONS['json']):
+            if self._legacy_rounds is None:
+                self._legacy_rounds = read_game_log(self.path)
+            return
+        size = os.path.getsize(self.path)
+        if size < self._scanned:
+            # Rewritten rather than appended to: start over
+            self._offsets, self._scanned = [], 0
+        if size == self._scanned:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._scanned)
+            offset = self._scanned
+            for line in f:
+                # A line without its newline is still being written; pick it up next time
+                if not line.endswith(b"\n"):
+                    break
+                if line.strip() and not line.startswith(b'{"_meta"'):
+                    self._offsets.append(offset)
+                offset += len(line)
+            self._scanned = offset
+
+    def __len__(self):
+        self._refresh()
+        return len(self._legacy_rounds) if self._legacy_rounds is not None else len(self._offsets)
+
+    def rounds(self, start=1, end=None):
+        """Yield rounds start..end (1-based, inclusive), parsing only those"""
+        self._refresh()
+        if self._legacy_rounds is not None:
+            yield from self._legacy_rounds[start - 1:end]
+            return
+        offsets = self._offsets[start - 1:end]
+        if not offsets:
+            return
+        with open(self.path, 'rb') as f:
+            for offset in offsets:
+                f.seek(offset)
+                line = f.readline()
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"Skipping unreadable line in {self.path}")
+
+    def players(self):
+        """Player names from the header, or from the first round of logs without one"""
+        players = read_log_metadata(self.path).get('players')
+        if players:
+            return [player['name'] for player in players]
+        first = next(self.rounds(1, 1), {})
+        return list(first.get('actions', {}))
+
+def read_game_log(path):
+    """Load every round of a game log as a list"""
+    return list(iter_game_log(path))
+
+def read_log_metadata(path):
+    """Return the header written by start_game_log, or {} for logs without one"""
+    if not path.endswith(LOG_EXTENSIONS['jsonl']):
+        return {}
+    with open(path, 'r') as f:
+        first_line = f.readline().strip()
+    try:
+        record = json.loads(first_line) if first_line else {}
+    except json.JSONDecodeError:
+        return {}
+    return record.get("_meta", {})
@@ -0,0 +1,119 @@
+from collections.abc import Sequence
+import numpy as np
+
+class MatchHistory(Sequence):
+    """Every round of one match, stored as action ids and payoffs in NumPy arrays.
+
+    Rows grow by doubling, so recording a round is amortized O(1). Per-player
+    action counts and payoff totals are kept as running sums, and each round's
+    text line is rendered once when it is recorded, so prompts can show a
+    summary of old rounds plus a window of recent ones without walking the
+    whole match again.
+
+    Indexing yields {player_name: action} dicts, oldest first, which is the
+    history format of modules/strategies.py and modules/players.py.
+    """
+
+    def __init__(self, players, actions, capacity=16):
+        self.players = list(players)
+        self.actions = list(actions)
+        self._action_ids = {action: index for index, action in enumerate(self.actions)}
+        self._rounds = 0
+        # -1 marks an action that is not in the game's action list
+        self._action_rows = np.full((capacity, len(self.players)), -1, dtype=np.int16)
+        self._payoff_rows = np.zeros((capacity, len(self.players)))
+        self.action_counts = np.zeros((len(self.players), len(self.actions)), dtype=np.int64)
+        self.payoff_totals = np.zeros(len(self.players))
+        self._lines = []
+
+    def __len__(self):
+        return self._rounds
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._rounds))]
+        if index < 0:
+            index += self._rounds
+        if not 0 <= index < self._rounds:
+            raise IndexError("round index out of range")
+        return {player: self._action_name(action_id) for player, action_id in zip(self.players, self._action_rows[index])}
+
+    def to_dict(self):
+        """JSON-serializable form, for checkpoints"""
+        return {
+            "players": self.players,
+            "actions": self.actions,
+            "action_ids": self.action_ids().tolist(),
+            "payoffs": self.payoffs().tolist()
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        history = cls(data["players"], data["actions"], capacity=max(16, len(data["action_ids"])))
+        for action_ids, payoffs in zip(data["action_ids"], data["payoffs"]):
+            history.record(
+                {player: history._action_name(action_id) for player, action_id in zip(history.players, action_ids)},
+                dict(zip(history.players, payoffs))
+            )
+        return history
+
+    def _action_name(self, action_id):
+        return self.actions[action_id] if action_id >= 0 else "None"
+
+    def record(self, actions, payoffs):
+        """Append one round from {player: action} and {player: payoff} dicts"""
+        if self._rounds == len(self._action_rows):
+            self._action_rows = np.concatenate([self._action_rows, np.full_like(self._action_rows, -1)])
+            self._payoff_rows = np.concatenate([self._payoff_rows, np.zeros_like(self._payoff_rows)])
+
+        row = self._rounds
+        for seat, player in enumerate(self.players):
+            action_id = self._action_ids.get(actions.get(player), -1)
+            self._action_rows[row, seat] = action_id
+            self._payoff_rows[row, seat] = payoffs.get(player, 0)
+            if action_id >= 0:
+                self.action_counts[seat, action_id] += 1
+        self.payoff_totals += self._payoff_rows[row]
+        self._rounds += 1
+
+        self._lines.append(", ".join(
+            f"{player}: {self._action_name(action_id)} ({self._format_number(payoff)})"
+            for player, action_id, payoff in zip(self.players, self._action_rows[row], self._payoff_rows[row])
+        ))
+
+    @staticmethod
+    def _format_number(value):
+        return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+    def action_ids(self):
+        """(rounds, players) array of action ids; a view, not a copy"""
+        return self._action_rows[:self._rounds]
+
+    def payoffs(self):
+        """(rounds, players) array of per-round payoffs; a view, not a copy"""
+        return self._payoff_rows[:self._rounds]
+
+    def round_line(self, index):
+        """Pre-rendered 'player: action (payoff), ...' text of one round"""
+        return self._lines[index]
+
+    def summary(self, end):
+        """Per-player action counts and payoff totals over rounds [0, end).
+
+        Derived from the running totals minus the rounds after `end`, so the
+        cost depends on the size of the recent window, not on the match length.
+        """
+        counts = self.action_counts.copy()
+        totals = self.payoff_totals.copy()
+        recent = self._action_rows[end:self._rounds]
+        for seat in range(len(self.players)):
+            valid = recent[:, seat][recent[:, seat] >= 0]
+            counts[seat] -= np.bincount(valid, minlength=len(self.actions))
+        totals -= self._payoff_rows[end:self._rounds].sum(axis=0)
+        return {
+            player: {
+                "actions": {action: int(count) for action, count in zip(self.actions, counts[seat]) if count},
+                "payoff": self._format_number(totals[seat])
+            }
+            for seat, player in enumerate(self.players)
+        }
@@ -0,0 +1,277 @@
+from datetime import datetime
+from .players import create_local_player
+from .match_history import MatchHistory
+from .role_manager import Role
+from .checkpoint import write_json_atomic, remove_checkpoint
+
+class RequestFailedError(Exception):
+    """An LLM request came back empty after all retries while on_request_failure is 'abort'"""
+
+class MatchState:
+    """One game as a state machine that advances when its LLM responses arrive.
+
+    pending_requests() returns the (messages, provider, model) requests of the
+    current phase, and submit_responses() takes their responses in the same
+    order and moves on to the next phase or round. How the requests are sent is
+    up to the caller: MainController.run_game sends them right away, and the
+    batch runner collects the requests of many matches into one batch job so
+    all matches advance in lock-step.
+
+    Prompt generation, parsing and sink events come from the controller; the
+    log goes to `logging`, which must be a LoggingModule of its own when
+    several matches run interleaved.
+
+    With a checkpoint_path, the full match state is written there (atomically)
+    after every round and removed when the match finishes; MatchState.resume
+    continues from it.
+    """
+
+    ACTION = 'action'
+    REFLECTION = 'reflection'
+    FINISHED = 'finished'
+
+    def __init__(self, controller, game_rules, roles, logging=None, checkpoint_path=None):
+        self._setup(controller, game_rules, roles, logging, checkpoint_path)
+
+        # Initialize game state with empty dicts
+        self.game_state = {"round": 0, "actions": {}, "reflections": {}, "payoffs": {}}
+        self.log_id = self.logging.start_game_log(game_rules.game_name, metadata={
+            "game": game_rules.game_name,
+            "started_at": datetime.now().isoformat(timespec='seconds'),
+            "players": [
+                {"name": role.name, "behavior": role.behavior,
+                 "provider": role.llm_config['provider'], "model": role.llm_config['model']}
+                if role.is_llm else
+                {"name": role.name, "behavior": role.behavior, "strategy": role.strategy}
+                for role in roles
+            ]
+        })
+
+        # Every round of the match; prompts render a window of it and local players read it
+        self.game_state["history"] = MatchHistory([role.name for role in roles], list(game_rules.get_actions()))
+
+        # Track cumulative scores
+        self.game_state["cumulative_scores"] = {role.name: 0 for role in roles}
+        # How many actions came from each ParseOutcome over the match (not logged per round)
+        self.game_state["parse_outcomes"] = {}
+
+        self._advance()
+
+    def _setup(self, controller, game_rules, roles, logging, checkpoint_path):
+        self.controller = controller
+        self.sink = controller.sink
+        self.game_rules = game_rules
+        self.roles = roles
+        self.logging = logging if logging else controller.logging
+        self.checkpoint_path = checkpoint_path
+        self.winners = None
+        self.phase = None
+        self._requests = []
+
+        # Roles backed by a local strategy are decided in-process, never through the LLM
+        self.llm_roles = [role for role in roles if role.is_llm]
+        self.local_players = {
+            role.name: create_local_player(role.strategy, seed=index)
+            for index, role in enumerate(roles) if not role.is_llm
+        }
+
+    def _advance(self):
+        if self.game_rules.is_game_over(self.game_state):
+            self._finish()
+        else:
+            self._start_round()
+
+    def checkpoint(self):
+        """Everything needed to continue the match after the last completed round"""
+        game_state = {key: value for key, value in self.game_state.items() if key != "history"}
+        return {
+            "game": self.game_rules.game_name,
+            "log_path": self.logging.current_log,
+            "roles": [
+                {"name": role.name, "behavior": role.behavior, "llm_config": role.llm_config, "strategy": role.strategy}
+                for role in self.roles
+            ],
+            "game_state": game_state,
+            "history": self.game_state["history"].to_dict(),
+            "local_players": {name: player.get_state() for name, player in self.local_players.items()},
+            "saved_at": datetime.now().isoformat(timespec='seconds')
+        }
+
+    @classmethod
+    def resume(cls, controller, checkpoint, game_rules=None, logging=None, checkpoint_path=None):
+        """Rebuild a match from checkpoint() output and start its next round"""
+        from .game_rules import GameRules
+
+        match = cls.__new__(cls)
+        roles = [Role(role["name"], role["behavior"], role["llm_config"], role.get("strategy")) for role in checkpoint["roles"]]
+        game_rules = game_rules if game_rules else GameRules(checkpoint["game"], sink=controller.sink)
+        match._setup(controller, game_rules, roles, logging, checkpoint_path)
+        # Later rounds go on in the same log file
+        match.log_id = match.logging.resume_game_log(checkpoint["log_path"])
+
+        match.game_state = dict(checkpoint["game_state"])
+        match.game_state["history"] = MatchHistory.from_dict(checkpoint["history"])
+        match.game_state.setdefault("parse_outcomes", {})
+        for name, state in checkpoint.get("local_players", {}).items():
+            match.local_players[name].set_state(state)
+
+        match.sink.debug(f"Resuming {checkpoint['game']} after round {match.game_state['round']}")
+        match._advance()
+        return match
+
+    @property
+    def finished(self):
+        return self.phase == self.FINISHED
+
+    def pending_requests(self):
+        """(messages, provider, model) for every LLM player in the current phase, in player order"""
+        return list(self._requests)
+
+    def request_options(self):
+        """send_request keyword arguments for the current phase (streaming applies to actions only)"""
+        return dict(self.controller.action_request_options) if self.phase == self.ACTION else {}
+
+    def submit_responses(self, responses):
+        """Consume the responses to pending_requests() and advance to the next phase"""
+        if self.controller.on_request_failure == 'abort' and any(response is None for response in responses):
+            # The round is neither logged nor checkpointed, so resuming replays it from the last checkpoint
+            failed = [role.name for role, response in zip(self.llm_roles, responses) if response is None]
+            raise RequestFailedError(f"No response for {failed} in round {self.game_state['round'] + 1}")
+        if self.phase == self.ACTION:
+            self._complete_action_phase(responses)
+        elif self.phase == self.REFLECTION:
+            self._complete_reflection_phase(responses)
+        else:
+            raise RuntimeError("The match is already finished")
+
+    def _start_round(self):
+        game_state = self.game_state
+        self.sink.round_started(game_state["round"] + 1)
+
+        # Action Phase
+        self.phase = self.ACTION
+        self.sink.phase_started('action')
+        self._reflections = {}
+        # In fused mode the action response also carries the reflection on the previous round
+        self._fused_reflection = self.controller.reflection_mode == 'fused' and game_state["round"] > 0
+
+        # Build every player's prompt first so all requests can go out together
+        self._requests = []
+        for role in self.llm_roles:
+            # Pass game_rules object to prompt generator
+            prompt = self.controller.prompt_generator.generate_messages(
+                role,
+                game_state,
+                self.game_rules,
+                reflect=self._fused_reflection
+            )
+            self._requests.append((prompt, role.llm_config['provider'], role.llm_config['model']))
+            self.sink.prompt_created(role, prompt, 'action')
+
+    def _complete_action_phase(self, responses):
+        game_state = self.game_state
+        game_rules = self.game_rules
+        parser = self.controller.response_parser
+        responses = dict(zip([role.name for role in self.llm_roles], responses))
+        current_actions = {}
+
+        for role in self.roles:
+            if not role.is_llm:
+                action = self.local_players[role.name].choose_action(game_state["history"], role.name, game_rules.get_actions())
+                current_actions[role.name] = {'action': action}
+                self.sink.action_chosen(role, action)
+                continue
+
+            response = responses[role.name]
+            self.sink.response_received(role, response, 'action')
+
+            # Parse response using available actions from game_rules
+            result = parser.parse(response, game_rules.get_actions(), reflection=self._fused_reflection)
+            action = result.action
+            game_state["parse_outcomes"][result.outcome] = game_state["parse_outcomes"].get(result.outcome, 0) + 1
+            if self._fused_reflection:
+                self._reflections[role.name] = result.reflection
+                self.sink.reflection_received(role, result.reflection)
+            current_actions[role.name] = {
+                'action': action,
+                'raw_response': response,
+                # How the action was obtained; failures mean the default action was played
+                'parse_outcome': result.outcome
+            }
+
+            self.sink.action_chosen(role, action)
+
+        # Update game state with current actions
+        game_state["actions"] = current_actions
+
+        # Calculate payoffs using the game_rules object
+        payoffs = game_rules.get_payoff(game_state["actions"])
+        game_state["payoffs"] = payoffs
+        game_state["history"].record({player: data['action'] for player, data in current_actions.items()}, payoffs)
+
+        # Update cumulative scores
+        for player, score in payoffs.items():
+            game_state["cumulative_scores"][player] += score
+
+        self.sink.round_results(current_actions, payoffs, game_state["cumulative_scores"])
+
+        # Fused mode already collected the reflections on the previous round with these actions
+        if self.controller.reflection_mode == 'fused':
+            self._end_round()
+            return
+
+        # Reflection Phase (local players have nothing to reflect with)
+        self.phase = self.REFLECTION
+        self.sink.phase_started('reflection')
+        self._requests = []
+        for role in self.llm_roles:
+            reflection_prompt = self.controller.prompt_generator.generate_reflection_messages(
+                role,
+                game_state,
+                game_rules
+            )
+            self._requests.append((reflection_prompt, role.llm_config['provider'], role.llm_config['model']))
+            self.sink.prompt_created(role, reflection_prompt, 'reflection')
+
+    def _complete_reflection_phase(self, responses):
+        for role, reflection_response in zip(self.llm_roles, responses):
+            self.sink.response_received(role, reflection_response, 'reflection')
+            reflection = self.controller.response_parser.parse_reflection(reflection_response)
+            self._reflections[role.name] = reflection
+
+            self.sink.reflection_received(role, reflection)
+
+        self._end_round()
+
+    def _end_round(self):
+        game_state = self.game_state
+        # Update reflections in game state
+        game_state["reflections"] = self._reflections
+
+        # Update game state
+        game_state["round"] += 1
+
+        self.controller.visualization.update_display(game_state)
+        # Each log line holds its own round; the full history would make logs grow quadratically
+        self.logging.log_round({key: value for key, value in game_state.items() if key not in ("history", "parse_outcomes")})
+
+        self.sink.round_completed(game_state)
+
+        if self.checkpoint_path:
+            write_json_atomic(self.checkpoint_path, self.checkpoint())
+
+        self._advance()
+
+    def _finish(self):
+        self.phase = self.FINISHED
+        self._requests = []
+
+        # Determine winner(s)
+        scores = self.game_state["cumulative_scores"]
+        max_score = max(scores.values())
+        self.winners = [player for player, score in scores.items() if score == max_score]
+
+        self.sink.game_over(scores, self.winners)
+
+        self.logging.save_log()
+        remove_checkpoint(self.checkpoint_path)
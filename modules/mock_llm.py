@@ -0,0 +1,207 @@
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import types
+from .strategies import get_strategy
+
+ROLE_NAME_PATTERNS = [
+    re.compile(r"You are now playing the role of (.+?)\.\s"),
+    re.compile(r"你现在需要扮演(.+?)。"),
+]
+ACTIONS_HEADERS = ("Available Actions:", "可用行动：")
+PREVIOUS_ACTIONS_HEADER = "Previous Actions:"
+
+class MockLLMError(Exception):
+    """Injected failure, raised like a provider error so retry paths get exercised"""
+
+def _bullet_block(lines, headers):
+    """Parse the '- item' lines that follow the first matching header"""
+    for index, line in enumerate(lines):
+        if line.strip() in headers:
+            items = []
+            for item in lines[index + 1:]:
+                item = item.strip()
+                if not item.startswith("- "):
+                    break
+                items.append(item[2:])
+            return items
+    return []
+
+class _MockBackend:
+    """Shared logic of the sync and async mock clients.
+
+    The model name selects a strategy from modules/strategies.py. The strategy
+    reads the role name, available actions and previous round from the prompt,
+    so the mock exercises the real prompt generator and response parser.
+    Decisions are seeded from (seed, model, prompt) and therefore identical
+    across runs; latency and failures come from a separate seeded stream.
+    """
+
+    def __init__(self, provider_config):
+        self.seed = provider_config.get('seed', 0)
+        latency = provider_config.get('latency', [0.0, 0.0])
+        self.min_latency, self.max_latency = (latency, latency) if isinstance(latency, (int, float)) else latency
+        self.failure_rate = provider_config.get('failure_rate', 0.0)
+        # Explanation emitted after the action tag, to mimic verbose models when streaming
+        self.trailing_chars = provider_config.get('trailing_chars', 0)
+        self._noise = random.Random(self.seed)
+        self._noise_lock = threading.Lock()
+
+    def draw_latency_and_failure(self):
+        with self._noise_lock:
+            latency = self._noise.uniform(self.min_latency, self.max_latency)
+            failed = self._noise.random() < self.failure_rate
+        return latency, failed
+
+    def complete(self, model, messages, response_format=None):
+        prompt = "\n".join(message['content'] for message in messages)
+        structured = (response_format or {}).get('type') == 'json_object'
+        if "<Reflection>" in prompt and "<Action>" not in prompt:
+            reflection = f"I am playing {model} and will keep following it next round."
+            content = json.dumps({"reflection": reflection}) if structured else f"<Reflection>{reflection}</Reflection>"
+        else:
+            content = self._decide(model, prompt, structured)
+        return types.SimpleNamespace(
+            model=model,
+            choices=[types.SimpleNamespace(
+                index=0,
+                finish_reason="stop",
+                message=types.SimpleNamespace(role="assistant", content=content)
+            )],
+            usage=types.SimpleNamespace(
+                prompt_tokens=len(prompt) // 4,
+                completion_tokens=len(content) // 4,
+                total_tokens=(len(prompt) + len(content)) // 4
+            )
+        )
+
+    def _decide(self, model, prompt, structured=False):
+        strategy = get_strategy(model)
+        lines = prompt.splitlines()
+
+        me = None
+        for pattern in ROLE_NAME_PATTERNS:
+            match = pattern.search(prompt)
+            if match:
+                me = match.group(1).strip()
+                break
+
+        actions = _bullet_block(lines, ACTIONS_HEADERS) or ["Cooperate", "Defect"]
+        history = []
+        previous = _bullet_block(lines, (PREVIOUS_ACTIONS_HEADER,))
+        if previous:
+            history.append(dict(item.split(": ", 1) for item in previous if ": " in item))
+
+        digest = hashlib.sha256(f"{self.seed}|{model}|{prompt}".encode('utf-8')).digest()
+        rng = random.Random(int.from_bytes(digest[:8], 'big'))
+        action = strategy(history, me, actions, rng)
+        if structured:
+            answer = {"action": action}
+            if "<Reflection>" in prompt:
+                answer["reflection"] = f"I am playing {model} and will keep following it."
+            return json.dumps(answer)
+        content = f"Following the {model} strategy.\n<Action>{action}</Action>"
+        if "<Reflection>" in prompt:
+            # Fused reflection mode asks for the reflection before the action
+            content = f"<Reflection>I am playing {model} and will keep following it.</Reflection>\n" + content
+        if self.trailing_chars:
+            filler = f"\nThis keeps me consistent with {model}."
+            content += (filler * (self.trailing_chars // len(filler) + 1))[:self.trailing_chars]
+        return content
+
+    @staticmethod
+    def chunks(response, size=16):
+        content = response.choices[0].message.content
+        return [
+            types.SimpleNamespace(choices=[types.SimpleNamespace(
+                index=0,
+                delta=types.SimpleNamespace(content=content[i:i + size])
+            )])
+            for i in range(0, len(content), size)
+        ]
+
+class _MockResponse:
+    """Stands in for the HTTP response behind a stream; closing it cancels the stream"""
+
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def aclose(self):
+        self.closed = True
+
+class _MockStream:
+    def __init__(self, chunks, latency):
+        self.chunks = chunks
+        # Total latency is spread over the chunks, so cancelling early saves time
+        self.chunk_latency = latency / max(1, len(chunks))
+        self.response = _MockResponse()
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if self.response.closed:
+                return
+            time.sleep(self.chunk_latency)
+            yield chunk
+
+    async def __aiter__(self):
+        # asyncio is only needed (and already loaded) inside a running event loop
+        import asyncio
+        for chunk in self.chunks:
+            if self.response.closed:
+                return
+            await asyncio.sleep(self.chunk_latency)
+            yield chunk
+
+class _MockCompletions:
+    def __init__(self, backend):
+        self.backend = backend
+
+    def create(self, model, messages, timeout=None, stream=False, **kwargs):
+        latency, failed = self.backend.draw_latency_and_failure()
+        if failed:
+            raise MockLLMError("Injected mock provider failure")
+        if stream:
+            return _MockStream(self.backend.chunks(self.backend.complete(model, messages, kwargs.get('response_format'))), latency)
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Mock request timed out after {timeout} seconds")
+        time.sleep(latency)
+        return self.backend.complete(model, messages, kwargs.get('response_format'))
+
+class _AsyncMockCompletions(_MockCompletions):
+    async def create(self, model, messages, timeout=None, stream=False, **kwargs):
+        import asyncio
+        latency, failed = self.backend.draw_latency_and_failure()
+        if failed:
+            raise MockLLMError("Injected mock provider failure")
+        if stream:
+            return _MockStream(self.backend.chunks(self.backend.complete(model, messages, kwargs.get('response_format'))), latency)
+        if timeout is not None and latency > timeout:
+            await asyncio.sleep(timeout)
+            raise TimeoutError(f"Mock request timed out after {timeout} seconds")
+        await asyncio.sleep(latency)
+        return self.backend.complete(model, messages, kwargs.get('response_format'))
+
+class MockLLMClient:
+    """Offline stand-in for the OpenAI client, selected with "type": "mock" in llm_providers.json"""
+
+    def __init__(self, provider_config):
+        self.chat = types.SimpleNamespace(completions=_MockCompletions(_MockBackend(provider_config)))
+
+    def close(self):
+        pass
+
+class AsyncMockLLMClient:
+    """Awaitable variant of MockLLMClient for AsyncLLMAccess"""
+
+    def __init__(self, provider_config):
+        self.chat = types.SimpleNamespace(completions=_AsyncMockCompletions(_MockBackend(provider_config)))
+
+    async def close(self):
+        pass
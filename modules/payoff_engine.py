@@ -0,0 +1,82 @@
+import itertools
+import numpy as np
+
+class PayoffTable:
+    """Payoff matrix compiled into a NumPy tensor indexed by action ids, one axis per player.
+
+    table[a_1, ..., a_n] holds the payoff vector of an action profile, so any
+    number of profiles (e.g. every game of a tournament at once) is evaluated
+    with a single fancy-indexing call instead of a string key per lookup.
+
+    The config format is the one in config/games/*.json: "Action1,Action2,...": [p1, p2, ...].
+    With symmetric=True, entries only need to be given once per unordered
+    profile; the permuted profiles are filled in with permuted payoffs.
+    """
+
+    def __init__(self, actions, payoff, symmetric=False):
+        self.actions = list(actions)
+        self.action_ids = {action.lower(): index for index, action in enumerate(self.actions)}
+
+        entries = {}
+        for key, values in payoff.items():
+            profile = tuple(self.action_id(name) for name in key.split(','))
+            if len(values) != len(profile):
+                raise ValueError(f"Payoff '{key}' has {len(values)} values for {len(profile)} players")
+            entries[profile] = list(values)
+
+        self.n_players = len(next(iter(entries))) if entries else 2
+        if any(len(profile) != self.n_players for profile in entries):
+            raise ValueError("All payoff keys must list the same number of players")
+
+        shape = (len(self.actions),) * self.n_players
+        self.table = np.zeros(shape + (self.n_players,), dtype=np.float64)
+        # Profiles missing from the config are flagged instead of silently paying 0
+        self.defined = np.zeros(shape, dtype=bool)
+
+        if symmetric:
+            for profile, values in entries.items():
+                for order in itertools.permutations(range(self.n_players)):
+                    permuted = tuple(profile[player] for player in order)
+                    # Explicit entries win over derived ones
+                    if permuted not in entries:
+                        self.table[permuted] = [values[player] for player in order]
+                        self.defined[permuted] = True
+        for profile, values in entries.items():
+            self.table[profile] = values
+            self.defined[profile] = True
+
+        # Integer configs keep integer scores in game_state and the logs
+        self.integral = bool(np.all(self.table == np.round(self.table)))
+
+    @classmethod
+    def from_game_config(cls, game_config):
+        return cls(game_config.get('actions', []), game_config.get('payoff', {}), game_config.get('symmetric', False))
+
+    def action_id(self, action):
+        """Id of an action name, case-insensitive; raises KeyError for unknown actions"""
+        try:
+            return self.action_ids[action.strip().lower()]
+        except KeyError:
+            raise KeyError(f"Unknown action '{action}', expected one of {self.actions}")
+
+    def encode(self, action_names):
+        return tuple(self.action_id(name) for name in action_names)
+
+    def is_defined(self, profiles):
+        profiles = np.asarray(profiles, dtype=np.intp)
+        return self.defined[tuple(np.moveaxis(profiles, -1, 0))]
+
+    def evaluate(self, profiles):
+        """Payoffs for action-id profiles of shape (..., n_players); returns shape (..., n_players)"""
+        profiles = np.asarray(profiles, dtype=np.intp)
+        if profiles.shape[-1] != self.n_players:
+            raise ValueError(f"Expected {self.n_players} actions per profile, got {profiles.shape[-1]}")
+        return self.table[tuple(np.moveaxis(profiles, -1, 0))]
+
+    def payoff(self, action_names):
+        """Payoff list for one profile of action names, or None if the profile is not in the config"""
+        profile = self.encode(action_names)
+        if len(profile) != self.n_players or not self.defined[profile]:
+            return None
+        values = self.table[profile].tolist()
+        return [int(value) for value in values] if self.integral else values
@@ -0,0 +1,67 @@
+import random
+from .strategies import get_strategy
+
+class LocalPlayer:
+    """A player decided in-process: no prompt, no LLM request and no reflection.
+
+    Subclasses implement choose_action(history, me, actions) where history is a
+    list of past rounds ({player_name: action}, oldest first).
+    """
+
+    def choose_action(self, history, me, actions):
+        raise NotImplementedError
+
+    def get_state(self):
+        """JSON-serializable internal state for checkpoints; None if the player is stateless"""
+        return None
+
+    def set_state(self, state):
+        pass
+
+class StrategyPlayer(LocalPlayer):
+    """Plays one of the named strategies in modules/strategies.py"""
+
+    def __init__(self, strategy_name, seed=0):
+        self.strategy_name = strategy_name
+        self.strategy = get_strategy(strategy_name)
+        self.rng = random.Random(seed)
+
+    def choose_action(self, history, me, actions):
+        return self.strategy(history, me, list(actions), self.rng)
+
+    def get_state(self):
+        version, internal, gauss_next = self.rng.getstate()
+        return [version, list(internal), gauss_next]
+
+    def set_state(self, state):
+        if state:
+            version, internal, gauss_next = state
+            self.rng.setstate((version, tuple(internal), gauss_next))
+
+class LookupTablePlayer(LocalPlayer):
+    """Maps the opponents' previous actions (comma-joined) to a reply, e.g. a trained policy.
+
+    The empty key "" is used in the first round; unknown situations fall back to `default`.
+    """
+
+    def __init__(self, table, default=None):
+        self.table = table
+        self.default = default
+
+    def choose_action(self, history, me, actions):
+        actions = list(actions)
+        key = "" if not history else ",".join(
+            action for player, action in history[-1].items() if player != me
+        )
+        choice = self.table.get(key, self.default)
+        return choice if choice in actions else actions[0]
+
+def create_local_player(strategy_config, seed=0):
+    """Build a LocalPlayer from a role's "strategy" entry: a strategy name or a lookup-table dict"""
+    if isinstance(strategy_config, str):
+        return StrategyPlayer(strategy_config, seed=seed)
+    if isinstance(strategy_config, dict) and strategy_config.get('type') == 'lookup':
+        return LookupTablePlayer(strategy_config.get('table', {}), strategy_config.get('default'))
+    if isinstance(strategy_config, dict) and 'name' in strategy_config:
+        return StrategyPlayer(strategy_config['name'], seed=strategy_config.get('seed', seed))
+    raise ValueError(f"Unsupported strategy config: {strategy_config}")
@@ -1,117 +1,182 @@
-import streamlit as st
+from .event_sink import EventSink
 
 class PromptGenerator:
-    def __init__(self, language='en'):
+    def __init__(self, language='en', sink=None, history_window=None):
         self.language = language
+        self.sink = sink if sink else EventSink()
+        # Rounds shown one by one; older ones are summarized. None shows every round
+        self.history_window = history_window
+        # The history text is the same for every player of a round, so it is rendered once
+        self._history_text = (None, None, None)
+        # Each template is split into a static system part (rules, actions, role, behavior),
+        # identical in every round, and a small per-round user part. Providers cache
+        # prompt prefixes, so repeated rounds only pay for the dynamic suffix.
         self.templates = {
             'en': {
-                'action': """
-You are now playing the role of {role_name}. 
-Your strategy in this game is to {behavior}.
-
+                'action': {
+                    'system': """
 Game Rules:
 {game_rules}
 
 Available Actions:
 {actions_description}
 
-{experience_section}
-
-Current Game State:
-{game_state}
-
-Based on the above information, please choose your next action. Your response should be in the following format:
+Your response should be in the following format:
 <Action>chosen_action</Action>
 Where chosen_action is one of the available actions.
 
 You may include additional content in your response, but ensure the action is enclosed in <Action></Action> tags and can be parsed correctly.
+
+You are now playing the role of {role_name}.
+Your strategy in this game is to {behavior}.
 """,
-                'reflection': """
-You are {role_name}, reflecting on the last round of the game.
+                    'user': """
+{experience_section}
 
-Last Round Results:
-- Your action: {my_action}
-- Other players' actions: {other_actions}
-- Payoffs: {payoffs}
+Current Game State:
+{game_state}
 
+Based on the above information, please choose your next action.
+""",
+                    'reflect': """
+Before choosing, reflect on the last round: analyze the results and give your strategic thoughts for the next round.
+Your thoughts should relate to your behavior. Write them first, in the following format:
+<Reflection>your_thoughts</Reflection>
+"""
+                },
+                'reflection': {
+                    'system': """
 Game Rules:
 {game_rules}
 
-Please analyze the results and provide your strategic thoughts for the next round. 
+You are {role_name}, reflecting on the last round of the game.
 Your thought should be relate to your behavior. Your behavior is: {behavior}.
 Your response should be in the following format:
 <Reflection>your_thoughts</Reflection>
+""",
+                    'user': """
+Last Round Results:
+- Your action: {my_action}
+- Other players' actions: {other_actions}
+- Payoffs: {payoffs}
+
+Please analyze the results and provide your strategic thoughts for the next round.
 """
+                }
             },
             'zh': {
-                'action': """
-你现在需要扮演{role_name}。
-你的游戏策略是{behavior}。
-
+                'action': {
+                    'system': """
 游戏规则：
 {game_rules}
 
 可用行动：
 {actions_description}
 
-{experience_section}
-
-当前游戏状态：
-{game_state}
-
-根据以上信息，请选择你的下一个行动。你的回复格式必须如下：
+你的回复格式必须如下：
 <Action>chosen_action</Action>
 其中 chosen_action 是可用行动之一。
 
 你可以在回复中添加额外内容，但需确保行动被 <Action></Action> 标签包裹并能被正确解析。
+
+你现在需要扮演{role_name}。
+你的游戏策略是{behavior}。
 """,
-                'reflection': """
-你是{role_name}，正在反思游戏上一轮的结果。
+                    'user': """
+{experience_section}
 
-上一轮结果：
-- 你的行动：{my_action}
-- 其他玩家的行动：{other_actions}
-- 收益：{payoffs}
+当前游戏状态：
+{game_state}
 
+根据以上信息，请选择你的下一个行动。
+""",
+                    'reflect': """
+在选择之前，请先反思上一轮的结果并给出你对下一轮的战略思考。
+请你确保你的思考和你的行为模式所匹配。请先写出反思，格式如下：
+<Reflection>your_thoughts</Reflection>
+"""
+                },
+                'reflection': {
+                    'system': """
 游戏规则：
 {game_rules}
 
-请分析结果并提供你对下一轮的战略思考。
+你是{role_name}，正在反思游戏上一轮的结果。
 请你确保你的思考和你的行为模式所匹配，你的行为模式是：{behavior}。
 你的回复格式必须如下：
 <Reflection>your_thoughts</Reflection>
+""",
+                    'user': """
+上一轮结果：
+- 你的行动：{my_action}
+- 其他玩家的行动：{other_actions}
+- 收益：{payoffs}
+
+请分析结果并提供你对下一轮的战略思考。
 """
+                }
             }
         }
+        # Rendered system parts per (phase, language, game, role, behavior, actions)
+        self._system_prompts = {}
+
+    @staticmethod
+    def to_text(messages):
+        """Flatten chat messages into one prompt string"""
+        return "\n".join(message['content'] for message in messages)
+
+    def _system_prompt(self, phase, role, game_rules, actions_dict=None):
+        """Static part of a prompt, rendered once per game and role and reused every round"""
+        game_name = getattr(game_rules, 'game_name', None) or str(game_rules)
+        key = (phase, self.language, game_name, role.name, role.behavior,
+               tuple(actions_dict) if actions_dict is not None else None)
+        cached = self._system_prompts.get(key)
+        if cached is not None:
+            return cached
+
+        template = self.templates.get(self.language, self.templates['en'])[phase]['system']
 
-    def generate_prompt(self, role, game_state, game_rules, actions_dict=None, experience=None):
-        template = self.templates.get(self.language, self.templates['en'])['action']
-        
-        # Get actions from game_rules if not provided
-        if actions_dict is None:
-            if hasattr(game_rules, 'get_actions'):
-                actions_dict = game_rules.get_actions()
-            else:
-                st.warning("No actions provided and game_rules doesn't have get_actions()")
-                actions_dict = {}
-        
-        # Debug
-        print(f"Generating prompt for {role.name}")
-        print(f"Available actions: {actions_dict}")
-        
-        # Format actions description
-        if isinstance(actions_dict, dict):
-            actions_description = "\n".join([f"- {action}" for action in actions_dict.keys()])
-        elif isinstance(actions_dict, list):
-            actions_description = "\n".join([f"- {action}" for action in actions_dict])
-        else:
-            actions_description = str(actions_dict)
-        
         # Get game rules text
         if hasattr(game_rules, 'get_rules'):
             rules_text = game_rules.get_rules()
         else:
             rules_text = str(game_rules)
+
+        fields = {"role_name": role.name, "behavior": role.behavior, "game_rules": rules_text}
+        if phase == 'action':
+            # Get actions from game_rules if not provided
+            if actions_dict is None:
+                if hasattr(game_rules, 'get_actions'):
+                    actions_dict = game_rules.get_actions()
+                else:
+                    self.sink.warning("No actions provided and game_rules doesn't have get_actions()")
+                    actions_dict = {}
+
+            # Format actions description
+            if isinstance(actions_dict, dict):
+                fields["actions_description"] = "\n".join([f"- {action}" for action in actions_dict.keys()])
+            elif isinstance(actions_dict, list):
+                fields["actions_description"] = "\n".join([f"- {action}" for action in actions_dict])
+            else:
+                fields["actions_description"] = str(actions_dict)
+
+        rendered = template.format(**fields).strip()
+        self._system_prompts[key] = rendered
+        return rendered
+
+    def generate_messages(self, role, game_state, game_rules, actions_dict=None, experience=None, reflect=False):
+        """Action prompt as [system, user] chat messages: cached static prefix, per-round suffix.
+
+        reflect=True also asks for the reflection on the previous round in the same
+        response (fused reflection mode); it only changes the user message.
+        """
+        templates = self.templates.get(self.language, self.templates['en'])['action']
+        template = templates['user']
+        
+        # Debug
+        print(f"Generating prompt for {role.name}")
+        
+        system_prompt = self._system_prompt('action', role, game_rules, actions_dict)
         
         # Format game state
         game_state_text = self._format_game_state(game_state)
@@ -119,18 +184,21 @@ Your response should be in the following format:
         # Process experience section
         experience_section = "Previous Experience (if any):\n" + experience if experience else ""
         
-        # Format the prompt
-        formatted_prompt = template.format(
-            role_name=role.name,
-            behavior=role.behavior,
-            game_rules=rules_text,
-            actions_description=actions_description,
+        user_prompt = template.format(
             experience_section=experience_section,
             game_state=game_state_text
-        )
+        ).strip()
+        if reflect:
+            user_prompt += "\n\n" + templates['reflect'].strip()
         
-        st.write(f"Debug - Prompt for {role.name} created")
-        return formatted_prompt
+        self.sink.debug(f"Debug - Prompt for {role.name} created")
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def generate_prompt(self, role, game_state, game_rules, actions_dict=None, experience=None, reflect=False):
+        return self.to_text(self.generate_messages(role, game_state, game_rules, actions_dict, experience, reflect))
 
     def _format_game_state(self, game_state):
         """Format game state into readable text"""
@@ -143,6 +211,11 @@ Your response should be in the following format:
         round_num = game_state.get('round', 0)
         result.append(f"Current Round: {round_num + 1}")  # +1 for human-readable round number
         
+        # Rounds before the previous one, from the match history
+        history = game_state.get('history')
+        if history is not None and len(history) > 1:
+            result.append(self._format_history(history))
+        
         # Add history of actions if available
         if 'actions' in game_state and game_state['actions']:
             result.append("\nPrevious Actions:")
@@ -160,8 +233,31 @@ Your response should be in the following format:
         
         return "\n".join(result)
 
-    def generate_reflection_prompt(self, role, game_state, game_rules):
-        template = self.templates.get(self.language, self.templates['en'])['reflection']
+    def _format_history(self, history):
+        """Summary of rounds outside the window plus one line per recent round, excluding the last"""
+        cached_history, cached_rounds, cached_text = self._history_text
+        if cached_history is history and cached_rounds == len(history):
+            return cached_text
+
+        rounds = len(history)
+        start = max(0, rounds - self.history_window) if self.history_window else 0
+        result = []
+        if start > 0:
+            result.append(f"\nSummary of Rounds 1-{start}:")
+            for player, summary in history.summary(start).items():
+                counts = ", ".join(f"{action} x{count}" for action, count in summary['actions'].items())
+                result.append(f"- {player}: {counts}; total payoff {summary['payoff']}")
+        if start < rounds - 1:
+            result.append("\nRecent Rounds:")
+            for index in range(start, rounds - 1):
+                result.append(f"- Round {index + 1}: {history.round_line(index)}")
+
+        text = "\n".join(result)
+        self._history_text = (history, rounds, text)
+        return text
+
+    def generate_reflection_messages(self, role, game_state, game_rules):
+        template = self.templates.get(self.language, self.templates['en'])['reflection']['user']
         
         # Extract player's action
         my_action = "None"
@@ -189,20 +285,16 @@ Your response should be in the following format:
         else:
             payoffs_text = str(game_state["payoffs"])
         
-        # Get rules text
-        if hasattr(game_rules, 'get_rules'):
-            rules_text = game_rules.get_rules()
-        else:
-            rules_text = str(game_rules)
-            
-        # Format the prompt
-        formatted_prompt = template.format(
-            role_name=role.name,
-            behavior=role.behavior,  # Added behavior parameter
+        user_prompt = template.format(
             my_action=my_action,
             other_actions=other_actions_text,
-            payoffs=payoffs_text,
-            game_rules=rules_text
-        )
+            payoffs=payoffs_text
+        ).strip()
         
-        return formatted_prompt
\ No newline at end of file
+        return [
+            {"role": "system", "content": self._system_prompt('reflection', role, game_rules)},
+            {"role": "user", "content": user_prompt}
+        ]
+
+    def generate_reflection_prompt(self, role, game_state, game_rules):
+        return self.to_text(self.generate_reflection_messages(role, game_state, game_rules))
@@ -0,0 +1,154 @@
+import random
+import threading
+import time
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at rate_per_minute.
+
+    reserve() always succeeds and returns how long the caller must wait before
+    using what it reserved, so concurrent callers queue fairly instead of polling.
+    """
+
+    def __init__(self, rate_per_minute, capacity=None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, amount=1):
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self, amount):
+        """Give back over-reserved tokens (negative amounts charge extra)"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class ProviderRateLimiter:
+    """Requests/min and tokens/min budgets of one provider, shared by every caller in the process"""
+
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self, tokens):
+        wait = 0.0
+        if self.requests:
+            wait = max(wait, self.requests.reserve(1))
+        if self.tokens and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        with self._lock:
+            # A 429 seen by any caller pauses all of them
+            wait = max(wait, self.blocked_until - time.monotonic())
+        return wait
+
+    def acquire(self, tokens=0):
+        wait = self._reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens=0):
+        # Imported here so synchronous callers never load asyncio
+        import asyncio
+        wait = self._reserve(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def settle(self, estimated_tokens, actual_tokens):
+        """Correct the token budget once the provider reports real usage"""
+        if self.tokens and actual_tokens is not None:
+            self.tokens.refund(estimated_tokens - actual_tokens)
+
+    def pause(self, seconds):
+        with self._lock:
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+# Fraction of each provider budget this process may use; tournament workers split it
+_rate_share = 1.0
+
+def set_rate_limit_share(share):
+    global _rate_share
+    with _limiters_lock:
+        _rate_share = share
+        _limiters.clear()
+
+def get_rate_limiter(provider_name, provider_config):
+    """Process-wide limiter for a provider, built from its 'rate_limits' block in llm_providers.json"""
+    with _limiters_lock:
+        if provider_name not in _limiters:
+            limits = provider_config.get('rate_limits') or {}
+            rpm = limits.get('requests_per_minute')
+            tpm = limits.get('tokens_per_minute')
+            _limiters[provider_name] = ProviderRateLimiter(
+                requests_per_minute=rpm * _rate_share if rpm else None,
+                tokens_per_minute=tpm * _rate_share if tpm else None
+            )
+        return _limiters[provider_name]
+
+def estimate_tokens(params):
+    """Rough prompt size (4 characters per token) plus the completion cap, as providers count it"""
+    prompt_chars = sum(len(message['content']) for message in params.get('messages', []))
+    completion = params.get('max_tokens') or params.get('max_completion_tokens') or 0
+    return prompt_chars // 4 + completion
+
+def backoff_delay(attempt, base_delay=2, max_delay=60):
+    """Exponential backoff with full jitter for the given 1-based retry attempt"""
+    return random.uniform(0, min(max_delay, base_delay * 2 ** (attempt - 1)))
+
+def retry_after_seconds(error):
+    """Seconds the provider asked us to wait (Retry-After / retry-after-ms), or None"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get('retry-after-ms')
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get('retry-after')
+    if not retry_after:
+        return None
+    try:
+        return float(retry_after)
+    except ValueError:
+        pass
+
+    # HTTP-date form (rare, so the email package is only loaded for it)
+    import email.utils
+    try:
+        retry_at = email.utils.parsedate_to_datetime(retry_after)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+def next_retry_delay(error, attempt, limiter=None, base_delay=2, max_delay=60):
+    """Delay before retry `attempt`: the provider's Retry-After if given, else jittered exponential backoff.
+
+    Rate-limit responses also pause the shared limiter so every concurrent
+    caller of the provider backs off together.
+    """
+    delay = retry_after_seconds(error)
+    if delay is None:
+        delay = backoff_delay(attempt, base_delay, max_delay)
+    else:
+        # Small jitter so callers released together do not collide again
+        delay += random.uniform(0, min(1.0, base_delay))
+    if limiter and getattr(error, 'status_code', None) == 429:
+        limiter.pause(delay)
+    return delay
@@ -0,0 +1,111 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+class ResponseCache:
+    """Persistent SQLite cache of LLM responses keyed on provider, model, prompt and sampling params.
+
+    Modes:
+    - 'off': never consulted
+    - 'record': serve hits from the cache, send misses to the provider and store the result
+    - 'replay': serve hits only; a miss returns None without any network call
+
+    The cache holds at most max_entries responses and evicts the least recently
+    used ones beyond that.
+    """
+
+    MODES = ('off', 'record', 'replay')
+
+    def __init__(self, path='cache/responses.sqlite', mode='record', max_entries=10000):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode '{mode}', expected one of {self.MODES}")
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    @classmethod
+    def from_config(cls, cache_config, mode=None):
+        """Build the cache from the 'response_cache' config block; returns None when it is off"""
+        cache_config = cache_config or {}
+        mode = mode or cache_config.get('mode', 'off')
+        if mode == 'off':
+            return None
+        return cls(
+            path=cache_config.get('path', 'cache/responses.sqlite'),
+            mode=mode,
+            max_entries=cache_config.get('max_entries', 10000)
+        )
+
+    @staticmethod
+    def make_key(provider_name, params):
+        """Content hash of everything that determines the completion"""
+        payload = json.dumps({"provider": provider_name, "params": params}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _connection(self):
+        # SQLite connections must not cross a fork, so each process opens its own
+        if self._conn is None or self._pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, provider TEXT, model TEXT, content TEXT, "
+                "created_at REAL, last_access REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_access ON responses(last_access)")
+            self._conn.commit()
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        """Return the cached response or None, counting the hit or miss"""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT content FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key, provider_name, model, content):
+        if self.mode != 'record' or content is None:
+            return
+        with self._lock:
+            conn = self._connection()
+            now = time.time()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, provider, model, content, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, provider_name, model, content, now, now)
+            )
+            # Drop least recently used rows beyond the size cap
+            conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM responses ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,)
+            )
+            conn.commit()
+
+    def stats(self):
+        with self._lock:
+            entries = self._connection().execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {"mode": self.mode, "hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
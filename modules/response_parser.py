@@ -1,75 +1,248 @@
+import json
 import re
-import streamlit as st
+from collections import Counter
+from .event_sink import EventSink
+
+# One pass over the response finds every <Action>/<Reflection> tag, in any case
+TAG_PATTERN = re.compile(r"<(/?)(action|reflection)\s*>", re.IGNORECASE)
+JSON_FENCE_PATTERN = re.compile(r"^```(?:json)?\s*(.*?)\s*```$", re.DOTALL | re.IGNORECASE)
+# Markup models wrap answers in, e.g. **Defect** or "Defect."
+STRIP_CHARS = " \t\r\n*_`'\".,:;!"
+
+class ParseOutcome:
+    """How an action was obtained from a response; the last four mean the default action was used"""
+
+    JSON = 'json'            # "action" field of a structured (JSON) response
+    TAGGED = 'tagged'        # <Action> content is exactly an action name
+    FUZZY = 'fuzzy'          # <Action> content names exactly one action among other words
+    UNTAGGED = 'untagged'    # no tag, but the text mentions exactly one action
+    EMPTY = 'empty'          # no response at all (e.g. the request failed)
+    INVALID = 'invalid'      # a tag or JSON field that names no action
+    AMBIGUOUS = 'ambiguous'  # no usable tag, and the text mentions several actions
+    MISSING = 'missing'      # no tag and no action mentioned
+
+    FAILURES = (EMPTY, INVALID, AMBIGUOUS, MISSING)
+
+class ParseResult:
+    def __init__(self, action, outcome, reflection=None):
+        self.action = action
+        self.outcome = outcome
+        self.reflection = reflection
+
+    @property
+    def failed(self):
+        return self.outcome in ParseOutcome.FAILURES
+
+    def __repr__(self):
+        return f"ParseResult(action={self.action!r}, outcome={self.outcome!r})"
+
+class ActionMatcher:
+    """Compiled matchers for one game's action set.
+
+    Names are looked up case-insensitively in a dict, and mentions inside free
+    text are found with one compiled alternation of all names (longest first,
+    not inside a longer Latin word), so a response is scanned once however
+    many actions the game has.
+    """
+
+    def __init__(self, actions):
+        self.actions = list(actions)
+        self.by_name = {action.lower(): action for action in self.actions}
+        names = sorted(self.by_name, key=len, reverse=True)
+        self.mention_pattern = re.compile(
+            r"(?<![A-Za-z])(" + "|".join(re.escape(name) for name in names) + r")(?![A-Za-z])",
+            re.IGNORECASE
+        ) if names else None
+
+    def exact(self, text):
+        return self.by_name.get(text.strip(STRIP_CHARS).lower())
+
+    def mentioned(self, text):
+        """Distinct actions named in text, in order of first mention"""
+        if self.mention_pattern is None:
+            return []
+        found = {}
+        for match in self.mention_pattern.finditer(text):
+            found.setdefault(self.by_name[match.group(1).lower()], None)
+        return list(found)
 
 class ResponseParser:
-    def parse_response(self, response, game_actions):
+    """Extracts actions and reflections from responses and counts how each action was obtained.
+
+    JSON responses (providers with "structured_output") are read from their
+    "action"/"reflection" fields. Otherwise the <Action> and <Reflection>
+    blocks are located in a single scan of the tags. When neither yields an
+    action the default (first) action is used as before, but the outcome is
+    recorded in `outcomes` and reported through the sink.
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink else EventSink()
+        self.outcomes = Counter()
+        self._matchers = {}
+
+    def matcher(self, game_actions):
+        """ActionMatcher for an action set, compiled once per distinct set"""
+        actions = tuple(self._normalize_actions(game_actions))
+        if actions not in self._matchers:
+            self._matchers[actions] = ActionMatcher(actions)
+        return self._matchers[actions]
+
+    @staticmethod
+    def _scan(response):
+        """Contents of the first <Action> and <Reflection> blocks and the reflection's span, in one pass"""
+        blocks, opened = {}, {}
+        for tag in TAG_PATTERN.finditer(response):
+            name = tag.group(2).lower()
+            if name in blocks:
+                continue
+            if not tag.group(1):
+                opened.setdefault(name, tag)
+            elif name in opened:
+                start = opened[name]
+                blocks[name] = (response[start.end():tag.start()].strip(), (start.start(), tag.end()))
+        return blocks
+
+    @staticmethod
+    def _structured(response):
+        """The response as a dict with lower-cased keys if it is a JSON object, else None"""
+        text = response.strip()
+        fenced = JSON_FENCE_PATTERN.match(text)
+        if fenced:
+            text = fenced.group(1)
+        if not text.startswith("{"):
+            return None
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        return {str(key).lower(): value for key, value in data.items()} if isinstance(data, dict) else None
+
+    def parse(self, response, game_actions, reflection=False):
+        """ParseResult for a response; with reflection=True the reflection is extracted too (fused mode)"""
+        matcher = self.matcher(game_actions)
         if not response:
-            st.warning("Warning: Response is empty. Returning default action.")
-            print("Warning: Response is empty. Returning default action.")
-            return self._get_first_action(game_actions)
-        
-        # 使用正则表达式提取 <Action> 标签中的内容
-        match = re.search(r'<Action>(.*?)</Action>', response, re.DOTALL)
-        if match:
-            chosen_action = match.group(1).strip().lower()
-            st.write(f"Extracted action: '{chosen_action}'")
-            
-            # 将game_actions转换为一致的格式进行比较
-            available_actions = self._normalize_actions(game_actions)
-            
-            # 验证行动是否在可用行动列表中
-            for valid_action_key, valid_action_lower in available_actions.items():
-                if valid_action_lower == chosen_action:
-                    return valid_action_key
-            
-            # 如果没有精确匹配，尝试模糊匹配
-            for valid_action_key, valid_action_lower in available_actions.items():
-                if valid_action_lower in chosen_action or chosen_action in valid_action_lower:
-                    st.write(f"Fuzzy matched to: {valid_action_key}")
-                    return valid_action_key
-                    
-            st.warning(f"Warning: Chosen action '{chosen_action}' is not in available actions: {list(available_actions.keys())}. Returning default action.")
-            print(f"Warning: Chosen action '{chosen_action}' not found in: {list(available_actions.keys())}")
-            return self._get_first_action(game_actions)
-        else:
-            # 如果没找到标签，尝试在文本中查找动作关键词
-            response_lower = response.lower()
-            available_actions = self._normalize_actions(game_actions)
-            
-            for valid_action_key, valid_action_lower in available_actions.items():
-                if valid_action_lower in response_lower:
-                    st.write(f"Found action mention in text: {valid_action_key}")
-                    return valid_action_key
-            
-            st.warning("Warning: No valid <Action> tag or action mention found in response. Returning default action.")
-            print("Warning: No valid action found in response")
-            return self._get_first_action(game_actions)
-            
+            return self._result(None, ParseOutcome.EMPTY, matcher, "Response is empty",
+                                "No reflection provided" if reflection else None)
+
+        data = self._structured(response)
+        if data is not None and "action" in data:
+            reflection_text = str(data.get("reflection") or "No reflection provided") if reflection else None
+            action = matcher.exact(str(data["action"]))
+            outcome = ParseOutcome.JSON if action else ParseOutcome.INVALID
+            return self._result(action, outcome, matcher, f"JSON action '{data['action']}' is not an available action",
+                                reflection_text)
+
+        blocks = self._scan(response)
+        reflection_text = None
+        remainder = response
+        if reflection:
+            if "reflection" in blocks:
+                reflection_text, (start, end) = blocks["reflection"]
+                # An untagged answer must not be matched against actions named in the reflection
+                remainder = response[:start] + response[end:]
+            else:
+                reflection_text = "No reflection provided"
+
+        if "action" in blocks:
+            content = blocks["action"][0]
+            self.sink.debug(f"Extracted action: '{content}'")
+            action = matcher.exact(content)
+            if action:
+                return self._result(action, ParseOutcome.TAGGED, matcher, None, reflection_text)
+            mentioned = matcher.mentioned(content)
+            if len(mentioned) == 1:
+                self.sink.debug(f"Fuzzy matched to: {mentioned[0]}")
+                return self._result(mentioned[0], ParseOutcome.FUZZY, matcher, None, reflection_text)
+            return self._result(None, ParseOutcome.INVALID, matcher,
+                                f"Chosen action '{content}' is not in available actions: {matcher.actions}",
+                                reflection_text)
+
+        mentioned = matcher.mentioned(remainder)
+        if len(mentioned) == 1:
+            self.sink.debug(f"Found action mention in text: {mentioned[0]}")
+            return self._result(mentioned[0], ParseOutcome.UNTAGGED, matcher, None, reflection_text)
+        if mentioned:
+            return self._result(None, ParseOutcome.AMBIGUOUS, matcher,
+                                f"No <Action> tag and several actions mentioned: {mentioned}", reflection_text)
+        return self._result(None, ParseOutcome.MISSING, matcher,
+                            "No valid <Action> tag or action mention found in response", reflection_text)
+
+    def _result(self, action, outcome, matcher, problem, reflection):
+        self.outcomes[outcome] += 1
+        if action is None:
+            action = matcher.actions[0] if matcher.actions else "default"
+            self.sink.warning(f"Warning: {problem}. Returning default action.")
+            print(f"Warning: {problem} ({outcome})")
+        return ParseResult(action, outcome, reflection)
+
+    def parse_response(self, response, game_actions):
+        return self.parse(response, game_actions).action
+
     def _normalize_actions(self, game_actions):
-        """将各种可能的动作格式转换为统一的小写字典用于比较"""
-        if isinstance(game_actions, dict):
-            return {action: action.lower() for action in game_actions.keys()}
-        elif isinstance(game_actions, list):
-            return {action: action.lower() for action in game_actions}
-        else:
-            return {'default': 'default'}
-    
-    def _get_first_action(self, game_actions):
-        """获取第一个可用动作作为默认值"""
-        if isinstance(game_actions, dict) and game_actions:
-            return list(game_actions.keys())[0]
-        elif isinstance(game_actions, list) and game_actions:
-            return game_actions[0]
-        else:
-            return "default"
+        """Action names from a {name: description} dict or a list"""
+        if isinstance(game_actions, (dict, list, tuple)):
+            return list(game_actions)
+        return []
 
     def parse_reflection(self, response):
         if not response:
             return "No reflection provided"
-        
-        match = re.search(r'<Reflection>(.*?)</Reflection>', response, re.DOTALL)
-        if match:
-            return match.group(1).strip()
-        else:
-            # 如果没找到标签，返回整个响应作为反思内容
-            return response.strip()
\ No newline at end of file
+
+        data = self._structured(response)
+        if data is not None and data.get("reflection"):
+            return str(data["reflection"]).strip()
+
+        blocks = self._scan(response)
+        if "reflection" in blocks:
+            return blocks["reflection"][0]
+        # 如果没找到标签，返回整个响应作为反思内容
+        return response.strip()
+
+    def parse_action_and_reflection(self, response, game_actions):
+        """Split a fused response into (action, reflection)"""
+        result = self.parse(response, game_actions, reflection=True)
+        return result.action, result.reflection
+
+class IncrementalActionParser:
+    """Consumes a streamed response and resolves the <Action> content as soon as '</Action>' arrives.
+
+    Only the unmatched tail of the stream is searched, so each chunk costs time
+    proportional to its own length. The complete text stays available as .text.
+    """
+
+    OPEN_TAG = '<Action>'
+    CLOSE_TAG = '</Action>'
+
+    def __init__(self):
+        self.action = None
+        self._parts = []
+        self._tail = ''
+        self._inside = False
+
+    def feed(self, chunk):
+        """Add a chunk; returns the raw action text once the closing tag has been seen, else None"""
+        if not chunk:
+            return self.action
+        self._parts.append(chunk)
+        if self.action is not None:
+            return self.action
+
+        self._tail += chunk
+        if not self._inside:
+            start = self._tail.find(self.OPEN_TAG)
+            if start < 0:
+                # Keep just enough to match a tag split across chunks
+                self._tail = self._tail[-(len(self.OPEN_TAG) - 1):]
+                return None
+            self._tail = self._tail[start + len(self.OPEN_TAG):]
+            self._inside = True
+
+        end = self._tail.find(self.CLOSE_TAG)
+        if end >= 0:
+            self.action = self._tail[:end].strip()
+        return self.action
+
+    @property
+    def text(self):
+        return ''.join(self._parts)
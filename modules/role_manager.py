@@ -1,12 +1,20 @@
-import json
+from .config_registry import get_registry
 
 class Role:
-    def __init__(self, name, behavior, llm_config):
+    def __init__(self, name, behavior, llm_config, strategy=None):
         self.name = name
         self.behavior = behavior
         self.llm_config = llm_config
+        # A strategy name or lookup-table dict makes this a local player instead of an LLM
+        self.strategy = strategy
+
+    @property
+    def is_llm(self):
+        return self.strategy is None
         
     def __repr__(self):
+        if not self.is_llm:
+            return f"Role(name='{self.name}', behavior='{self.behavior[:20]}...', strategy={self.strategy})"
         return f"Role(name='{self.name}', behavior='{self.behavior[:20]}...', llm_config={self.llm_config})"
 
 class RoleManager:
@@ -22,19 +30,28 @@ class RoleManager:
     def __init__(self, roles_file='config/roles.json'):
         # Initialize only once
         if not self.initialized:
-            self.roles = self.load_roles(roles_file)
+            self.roles_file = roles_file
+            self._roles_data = None
+            self._roles = []
             self.temp_roles = []
             self.initialized = True
             print(f"Loaded {len(self.roles)} roles: {[r.name for r in self.roles]}")
 
-    def load_roles(self, roles_file):
+    @property
+    def roles(self):
+        # The registry re-parses roles.json only when it changes; Role objects are rebuilt with it
         try:
-            with open(roles_file, 'r') as f:
-                roles_data = json.load(f)
-            return [Role(r['name'], r['behavior'], r['llm_config']) for r in roles_data]
+            roles_data = get_registry().roles(self.roles_file)
         except Exception as e:
             print(f"Error loading roles file: {e}")
-            return []
+            return self._roles
+        if roles_data is not self._roles_data:
+            self._roles = self.load_roles(roles_data)
+            self._roles_data = roles_data
+        return self._roles
+
+    def load_roles(self, roles_data):
+        return [Role(r['name'], r['behavior'], r.get('llm_config'), r.get('strategy')) for r in roles_data]
 
     def get_role(self, name):
         # First check temporary roles
@@ -54,7 +71,7 @@ class RoleManager:
         print(f"Temporary roles: {[r.name for r in self.temp_roles]}")
         return None
     
-    def add_temp_role(self, name, behavior, llm_config):
+    def add_temp_role(self, name, behavior, llm_config, strategy=None):
         """Add a temporary role"""
         try:
             # Ensure no role with the same name exists
@@ -64,7 +81,7 @@ class RoleManager:
                 # Remove it if it's a temporary role
                 self.temp_roles = [r for r in self.temp_roles if r.name != name]
             
-            new_role = Role(name, behavior, llm_config)
+            new_role = Role(name, behavior, llm_config, strategy)
             self.temp_roles.append(new_role)
             print(f"Added temporary role: {new_role}")
             return new_role
@@ -0,0 +1,37 @@
+import concurrent.futures
+
+
+class RoundExecutor:
+    """Fan out the per-player LLM calls of one phase and collect them in player order"""
+
+    def __init__(self, max_workers=None):
+        # None means one worker per player in the phase
+        self.max_workers = max_workers
+
+    def run(self, tasks):
+        """Run zero-argument callables concurrently and return their results in task order"""
+        if not tasks:
+            return []
+
+        # A single player gains nothing from a pool
+        if len(tasks) == 1:
+            return [tasks[0]()]
+
+        workers = min(self.max_workers or len(tasks), len(tasks))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(task) for task in tasks]
+            # Collect by index, not completion order, so results stay aligned with players
+            return [future.result() for future in futures]
+
+    def send_all(self, llm_access, requests, **kwargs):
+        """Send (prompt, provider, model) requests concurrently; responses keep request order"""
+        tasks = [
+            (lambda p=prompt, prov=provider, m=model: llm_access.send_request(
+                prompt=p,
+                provider_name=prov,
+                model=m,
+                **kwargs
+            ))
+            for prompt, provider, model in requests
+        ]
+        return self.run(tasks)
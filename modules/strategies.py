@@ -0,0 +1,73 @@
+"""Classic repeated-game strategies as plain functions.
+
+Every strategy takes (history, me, actions, rng) and returns one of actions:
+- history: list of past rounds, oldest first, each a {player_name: action} dict
+- me: the deciding player's name
+- actions: the game's available actions; the cooperative action is the one named
+  "cooperate", otherwise the first, and the defecting one is "defect", otherwise the last
+- rng: a random.Random owned by the caller, so runs are reproducible
+"""
+
+def cooperative_action(actions):
+    for action in actions:
+        if action.lower().startswith("cooperat"):
+            return action
+    return actions[0]
+
+def defecting_action(actions):
+    for action in actions:
+        if action.lower().startswith("defect"):
+            return action
+    return actions[-1]
+
+def _opponent_actions(round_actions, me):
+    return [action for player, action in round_actions.items() if player != me]
+
+def always_cooperate(history, me, actions, rng):
+    return cooperative_action(actions)
+
+def always_defect(history, me, actions, rng):
+    return defecting_action(actions)
+
+def tit_for_tat(history, me, actions, rng):
+    """Cooperate first, then copy the opponent; against several opponents, defect if any defected"""
+    if not history:
+        return cooperative_action(actions)
+    opponents = _opponent_actions(history[-1], me)
+    if len(set(opponents)) == 1 and opponents[0] in actions:
+        return opponents[0]
+    return defecting_action(actions) if defecting_action(actions) in opponents else cooperative_action(actions)
+
+def grim_trigger(history, me, actions, rng):
+    """Cooperate until any opponent defects once, then defect forever"""
+    defect = defecting_action(actions)
+    for round_actions in history:
+        if defect in _opponent_actions(round_actions, me):
+            return defect
+    return cooperative_action(actions)
+
+def pavlov(history, me, actions, rng):
+    """Win-stay, lose-shift: cooperate after matching moves, defect after mismatched ones"""
+    if not history or me not in history[-1]:
+        return cooperative_action(actions)
+    mine = history[-1][me]
+    if all(action == mine for action in _opponent_actions(history[-1], me)):
+        return cooperative_action(actions)
+    return defecting_action(actions)
+
+def random_choice(history, me, actions, rng):
+    return rng.choice(list(actions))
+
+STRATEGIES = {
+    "always-cooperate": always_cooperate,
+    "always-defect": always_defect,
+    "tit-for-tat": tit_for_tat,
+    "grim-trigger": grim_trigger,
+    "pavlov": pavlov,
+    "random": random_choice,
+}
+
+def get_strategy(name):
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}', expected one of {list(STRATEGIES)}")
+    return STRATEGIES[name]
@@ -0,0 +1,115 @@
+import itertools
+import time
+import numpy as np
+from .strategies import STRATEGIES, cooperative_action, defecting_action
+
+class StrategySimulator:
+    """Plays the classic strategies of modules/strategies.py against each other without any LLM.
+
+    Every game of every pairing advances together: one round is a handful of
+    NumPy operations over arrays holding one entry per game, and payoffs come
+    from the game's compiled PayoffTable. The vectorized rules here mirror the
+    scalar functions in strategies.py for two-player games.
+    """
+
+    def __init__(self, game_rules, seed=0):
+        self.game_rules = game_rules
+        self.payoff_table = game_rules.payoff_table
+        if self.payoff_table.n_players != 2:
+            raise ValueError("The strategy simulator supports two-player games only")
+        actions = self.payoff_table.actions
+        self.cooperate = self.payoff_table.action_id(cooperative_action(actions))
+        self.defect = self.payoff_table.action_id(defecting_action(actions))
+        self.rng = np.random.default_rng(seed)
+
+    def _decide(self, strategy, round_index, mine, theirs, betrayed, size):
+        """Action ids for `size` games of one strategy; mine/theirs are last round's ids"""
+        if strategy == "always-cooperate":
+            return np.full(size, self.cooperate)
+        if strategy == "always-defect":
+            return np.full(size, self.defect)
+        if strategy == "random":
+            return self.rng.integers(0, len(self.payoff_table.actions), size)
+        if round_index == 0:
+            return np.full(size, self.cooperate)
+        if strategy == "tit-for-tat":
+            return theirs.copy()
+        if strategy == "grim-trigger":
+            return np.where(betrayed, self.defect, self.cooperate)
+        if strategy == "pavlov":
+            return np.where(mine == theirs, self.cooperate, self.defect)
+        raise ValueError(f"Unknown strategy '{strategy}', expected one of {list(STRATEGIES)}")
+
+    def _play(self, seat_strategies, strategy_names, rounds):
+        """Play all games for `rounds` rounds; seat_strategies is (games, 2) of strategy indexes"""
+        games = seat_strategies.shape[0]
+        actions = np.zeros((games, 2), dtype=np.intp)
+        scores = np.zeros((games, 2))
+        betrayed = np.zeros((games, 2), dtype=bool)
+
+        for round_index in range(rounds):
+            previous = actions.copy()
+            for seat in (0, 1):
+                other = 1 - seat
+                for index, strategy in enumerate(strategy_names):
+                    mask = seat_strategies[:, seat] == index
+                    if not mask.any():
+                        continue
+                    actions[mask, seat] = self._decide(
+                        strategy, round_index,
+                        previous[mask, seat], previous[mask, other], betrayed[mask, seat],
+                        int(mask.sum())
+                    )
+            scores += self.payoff_table.evaluate(actions)
+            betrayed |= actions[:, ::-1] == self.defect
+        return scores
+
+    def run(self, strategy_names=None, rounds=None, repetitions=1, self_play=True):
+        """Round-robin over strategies; returns per-pairing mean scores and per-strategy standings"""
+        strategy_names = list(strategy_names) if strategy_names else list(STRATEGIES)
+        rounds = rounds if rounds else self.game_rules.game_config.get('max_rounds', 3)
+
+        pairings = list(itertools.combinations(range(len(strategy_names)), 2))
+        if self_play:
+            pairings += [(index, index) for index in range(len(strategy_names))]
+        seat_strategies = np.repeat(np.array(pairings, dtype=np.intp), repetitions, axis=0)
+
+        start = time.perf_counter()
+        scores = self._play(seat_strategies, strategy_names, rounds)
+        elapsed = time.perf_counter() - start
+
+        results = []
+        standings = {name: {"games": 0, "wins": 0, "total_score": 0.0} for name in strategy_names}
+        for pairing_index, (first, second) in enumerate(pairings):
+            block = scores[pairing_index * repetitions:(pairing_index + 1) * repetitions]
+            names = [strategy_names[first], strategy_names[second]]
+            # Same naming as the batch runner for mirrored pairings
+            players = [f"{name} #{seat}" for seat, name in enumerate(names, start=1)] if first == second else names
+            best = block.max(axis=1, keepdims=True)
+            wins = (block == best).sum(axis=0)
+            results.append({
+                "players": players,
+                "strategies": names,
+                "games": repetitions,
+                "cumulative_scores": {player: float(mean) for player, mean in zip(players, block.mean(axis=0))},
+                "wins": {player: int(count) for player, count in zip(players, wins)}
+            })
+            for seat, name in enumerate(names):
+                standings[name]["games"] += repetitions
+                standings[name]["wins"] += int(wins[seat])
+                standings[name]["total_score"] += float(block[:, seat].sum())
+
+        for row in standings.values():
+            row["average_score"] = row["total_score"] / row["games"] if row["games"] else 0.0
+
+        total_rounds = rounds * seat_strategies.shape[0]
+        return {
+            "game": self.game_rules.game_name,
+            "rounds": rounds,
+            "repetitions": repetitions,
+            "games": int(seat_strategies.shape[0]),
+            "elapsed_s": elapsed,
+            "rounds_per_s": total_rounds / elapsed if elapsed else float('inf'),
+            "pairings": results,
+            "standings": standings
+        }
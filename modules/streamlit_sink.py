@@ -0,0 +1,243 @@
+from .event_sink import EventSink
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+
+class StreamlitEventSink(EventSink):
+    """Renders game events into the Streamlit page as they happen"""
+
+    def game_started(self, game_name, game_rules, role_names, temp_role_names):
+        # Display game rules at the beginning
+        st.markdown("## Game Rules")
+        st.markdown(game_rules.get_rules())
+
+        st.markdown("### Available Actions")
+        for action, desc in game_rules.get_actions().items():
+            st.markdown(f"- **{action}**: {desc}")
+
+        st.markdown(f"## Starting Game: {game_name}")
+        st.markdown(f"### Player List: {', '.join(role_names)}")
+        st.markdown(f"### Available temporary roles: {', '.join(temp_role_names)}")
+
+    def role_loaded(self, role):
+        st.markdown(f"**Retrieved role:** {role.name} (Behavior: {role.behavior[:50]}...)")
+
+    def round_started(self, round_number):
+        st.markdown(f"## Round {round_number}")
+        st.markdown(f"*Started at {datetime.now().strftime('%H:%M:%S')}*")
+
+    def phase_started(self, phase):
+        if phase == 'action':
+            st.markdown("### 🎭 Players deciding their actions...")
+        else:
+            st.markdown("### 💭 Players reflecting on this round...")
+
+    def prompt_created(self, role, prompt, phase):
+        if phase == 'action':
+            st.markdown(f"#### Player: **{role.name}** thinking...")
+            title = f"Prompt sent to {role.name} ({role.llm_config['provider']}/{role.llm_config['model']})"
+        else:
+            st.markdown(f"#### {role.name} is reflecting...")
+            title = f"Reflection prompt for {role.name}"
+        with st.expander(title):
+            messages = prompt if isinstance(prompt, list) else [{"role": "user", "content": prompt}]
+            for message in messages:
+                st.markdown(f"**{message['role']}**")
+                st.markdown(f"```\n{message['content']}\n```")
+
+    def response_received(self, role, response, phase):
+        # Reflections are shown once parsed, see reflection_received
+        if phase == 'action':
+            with st.expander(f"{role.name}'s full response"):
+                st.markdown(response)
+
+    def action_chosen(self, role, action):
+        st.markdown(f"**{role.name}** chose: **{action}**")
+
+    def round_results(self, actions, payoffs, cumulative_scores):
+        st.markdown("### 📊 Round Results")
+        actions_df = pd.DataFrame([
+            {"Player": player, "Action": data['action'], "Score": payoffs.get(player, 0)}
+            for player, data in actions.items()
+        ])
+        st.table(actions_df)
+
+        st.markdown("#### Cumulative Scores:")
+        st.table(pd.DataFrame([cumulative_scores]))
+
+    def reflection_received(self, role, reflection):
+        st.markdown(f"**{role.name}'s reflection:**")
+        st.markdown(reflection)
+        st.markdown("---")
+
+    def round_completed(self, game_state):
+        st.markdown(f"### ✅ Round {game_state['round']} completed at {datetime.now().strftime('%H:%M:%S')}")
+        st.markdown("---")
+
+    def game_over(self, cumulative_scores, winners):
+        st.markdown("## 🏁 Game Over!")
+
+        st.markdown("### 🏆 Final Scores")
+        st.table(pd.DataFrame([cumulative_scores]))
+
+        max_score = cumulative_scores[winners[0]]
+        if len(winners) == 1:
+            st.markdown(f"### 👑 Winner: {winners[0]} with {max_score} points!")
+        else:
+            st.markdown(f"### 👑 Tie between: {', '.join(winners)} with {max_score} points each!")
+
+    def debug(self, message):
+        st.write(message)
+
+    def warning(self, message):
+        st.warning(message)
+
+    def error(self, message):
+        st.error(message)
+
+
+def lazy_expander(label, key, render):
+    """An expander whose body is only rendered (and sent to the browser) while it is open.
+
+    Streamlit versions whose expanders cannot report their state get a
+    toggle inside the expander instead.
+    """
+    try:
+        expander = st.expander(label, key=key, on_change="rerun")
+    except TypeError:
+        with st.expander(label):
+            if st.toggle("Load", key=key):
+                render()
+        return
+    with expander:
+        if expander.open:
+            render()
+
+def render_messages(messages):
+    messages = messages if isinstance(messages, list) else [{"role": "user", "content": messages}]
+    for message in messages:
+        st.markdown(f"**{message['role']}**")
+        st.code(message['content'], language=None)
+
+class LiveGameEventSink(EventSink):
+    """Live game view that updates a fixed set of placeholders as events arrive.
+
+    StreamlitEventSink appends several elements per event, so the page (and
+    the work of the browser and server) grows with every round. Here the page
+    holds a status line, the current round's choices, the scoreboard and one
+    rounds table; the first three are replaced in place and the table gets
+    each new round appended with add_rows, which sends only that row.
+
+    Prompts, responses and reflections are not rendered during the game. They
+    are kept in `details` ({round: {player: {kind: body}}}) for
+    render_round_details, which draws a body only when its expander is opened.
+    """
+
+    PHASE_LABELS = {'action': "🎭 Players deciding their actions...", 'reflection': "💭 Players reflecting on this round..."}
+
+    def __init__(self):
+        self.details = {}
+        self._round = 0
+        self._choices = {}
+
+    def game_started(self, game_name, game_rules, role_names, temp_role_names):
+        self.details = {}
+        self._round = 0
+        with st.expander("Game Rules"):
+            st.markdown(game_rules.get_rules())
+            for action, desc in game_rules.get_actions().items():
+                st.markdown(f"- **{action}**: {desc}")
+        st.markdown(f"## {game_name}: {', '.join(role_names)}")
+        self._status = st.empty()
+        self._current = st.empty()
+        self._scores = st.empty()
+        self._table_slot = st.empty()
+        self._rounds_table = None
+
+    def _show_choices(self):
+        self._current.markdown("\n".join(f"- **{player}**: {choice}" for player, choice in self._choices.items()))
+
+    def _record(self, role, kind, body):
+        self.details.setdefault(self._round, {}).setdefault(role.name, {})[kind] = body
+
+    def round_started(self, round_number):
+        self._round = round_number
+        self._choices = {}
+        self._status.markdown(f"**Round {round_number}** · started at {datetime.now().strftime('%H:%M:%S')}")
+
+    def phase_started(self, phase):
+        self._status.markdown(f"**Round {self._round}** · {self.PHASE_LABELS.get(phase, phase)}")
+
+    def prompt_created(self, role, prompt, phase):
+        self._record(role, f"{phase}_prompt", prompt)
+        if phase == 'action':
+            self._choices[role.name] = "thinking..."
+            self._show_choices()
+
+    def response_received(self, role, response, phase):
+        self._record(role, f"{phase}_response", response)
+
+    def action_chosen(self, role, action):
+        self._choices[role.name] = f"**{action}**"
+        self._show_choices()
+
+    def round_results(self, actions, payoffs, cumulative_scores):
+        row = {"Round": self._round}
+        for player, data in actions.items():
+            row[player] = data['action']
+            row[f"{player} score"] = payoffs.get(player, 0)
+        frame = pd.DataFrame([row]).set_index("Round")
+        if self._rounds_table is None:
+            self._rounds_table = self._table_slot.dataframe(frame)
+        else:
+            self._rounds_table.add_rows(frame)
+        self._scores.dataframe(pd.DataFrame([cumulative_scores], index=["Total"]))
+
+    def reflection_received(self, role, reflection):
+        self._record(role, "reflection", reflection)
+
+    def round_completed(self, game_state):
+        self._status.markdown(f"**Round {game_state['round']}** completed at {datetime.now().strftime('%H:%M:%S')}")
+
+    def game_over(self, cumulative_scores, winners):
+        self._current.empty()
+        self._scores.dataframe(pd.DataFrame([cumulative_scores], index=["Final"]))
+        max_score = cumulative_scores[winners[0]]
+        if len(winners) == 1:
+            self._status.markdown(f"## 🏁 Game over · 👑 {winners[0]} wins with {max_score} points")
+        else:
+            self._status.markdown(f"## 🏁 Game over · 👑 Tie between {', '.join(winners)} with {max_score} points each")
+
+    def warning(self, message):
+        st.warning(message)
+
+    def error(self, message):
+        st.error(message)
+
+# Only the details browser reruns when its widgets change; older Streamlit reruns the page
+_fragment = getattr(st, "fragment", None) or (lambda function: function)
+
+DETAIL_LABELS = {
+    "action_prompt": "Action prompt",
+    "action_response": "Full response",
+    "reflection_prompt": "Reflection prompt",
+    "reflection_response": "Reflection response",
+    "reflection": "Reflection"
+}
+
+@_fragment
+def render_round_details(details, key="live_details"):
+    """Browse the prompts, responses and reflections kept by LiveGameEventSink, one round at a time"""
+    if not details:
+        return
+    round_number = st.selectbox("Round details", sorted(details), key=f"{key}_round")
+    for player, bodies in details[round_number].items():
+        for kind, label in DETAIL_LABELS.items():
+            if kind not in bodies:
+                continue
+            body = bodies[kind]
+            if kind.endswith("_prompt"):
+                render = lambda body=body: render_messages(body)
+            else:
+                render = lambda body=body: st.markdown(body if body else "*No response*")
+            lazy_expander(f"{player} · {label}", f"{key}_{round_number}_{player}_{kind}", render)
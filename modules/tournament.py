@@ -0,0 +1,346 @@
+import concurrent.futures
+import datetime
+import itertools
+import json
+import multiprocessing
+import os
+import random
+from .config_manager import ConfigManager
+from .role_manager import RoleManager, Role
+from .rate_limiter import set_rate_limit_share
+from .checkpoint import write_json_atomic, read_checkpoint
+
+# Set in each worker process by _init_worker
+_worker_semaphore = None
+
+def _init_worker(semaphore, rate_limit_share):
+    global _worker_semaphore
+    _worker_semaphore = semaphore
+    # Each worker gets an equal slice of every provider's rate budget
+    set_rate_limit_share(rate_limit_share)
+
+def run_tournament_job(job):
+    """Play one game job in the current process and return its result row"""
+    # Imported here so the parent process does not build a controller it never uses
+    from .main_controller import MainController
+
+    random.seed(job["seed"])
+    role_manager = RoleManager()
+    role_manager.clear_temp_roles()
+    for player in job["players"]:
+        role_manager.add_temp_role(
+            player["name"],
+            player["behavior"],
+            {"provider": player["provider"], "model": player["model"]} if player["provider"] else None,
+            player.get("strategy")
+        )
+
+    controller = MainController(role_manager=role_manager, cache_mode=job.get("cache_mode"))
+    controller.llm_access.request_semaphore = _worker_semaphore
+    checkpoint = job.get("checkpoint")
+    if checkpoint and os.path.exists(checkpoint):
+        # Left behind by an interrupted run: only the remaining rounds are played
+        game_state = controller.resume_game(checkpoint)
+    else:
+        game_state = controller.run_game(job["game"], [player["name"] for player in job["players"]], checkpoint_path=checkpoint)
+
+    result = _job_result(job, game_state)
+    cache = controller.llm_access.response_cache
+    if cache:
+        result["cache"] = {"hits": cache.hits, "misses": cache.misses}
+        cache.close()
+    return result
+
+def _job_result(job, game_state):
+    scores = game_state["cumulative_scores"]
+    max_score = max(scores.values())
+    return {
+        "job_id": job["job_id"],
+        "game": job["game"],
+        "repetition": job["repetition"],
+        "seed": job["seed"],
+        "players": job["players"],
+        "roles": {player["name"]: player["role"] for player in job["players"]},
+        "rounds": game_state["round"],
+        "cumulative_scores": dict(scores),
+        "winners": [player for player, score in scores.items() if score == max_score],
+        "parse_outcomes": dict(game_state.get("parse_outcomes", {}))
+    }
+
+def _job_roles(job):
+    """Role objects for a job's players, built directly so equal names in other jobs cannot clash"""
+    return [
+        Role(
+            player["name"],
+            player["behavior"],
+            {"provider": player["provider"], "model": player["model"]} if player["provider"] else None,
+            player.get("strategy")
+        )
+        for player in job["players"]
+    ]
+
+class TournamentScheduler:
+    """Expands role pairings x provider/model combos x repetitions into game jobs and runs them in parallel.
+
+    Jobs run in a process pool; a semaphore shared by every worker caps the
+    number of LLM requests in flight across the whole tournament. Each finished
+    game is appended to a JSON Lines results file under <log_directory>/tournaments/
+    as soon as it completes, next to the per-game logs the workers write.
+    """
+
+    def __init__(self, game_name='prisoner_dilemma', role_names=None, models=None, repetitions=1,
+                 self_play=False, base_seed=0, max_workers=None, max_inflight_requests=None, role_manager=None,
+                 cache_mode=None):
+        self.game_name = game_name
+        self.role_manager = role_manager if role_manager else RoleManager()
+        self.role_names = role_names
+        # "provider/model" strings; None keeps each role's own llm_config
+        self.models = models
+        self.repetitions = repetitions
+        self.self_play = self_play
+        self.base_seed = base_seed
+        self.max_workers = max_workers
+        self.max_inflight_requests = max_inflight_requests
+        # Response cache mode for every job; None uses config.json
+        self.cache_mode = cache_mode
+        self.log_directory = ConfigManager().get_config('log_directory')
+
+    def available_roles(self):
+        """Permanent roles plus the temporary roles created in the UI"""
+        roles = {role.name: role for role in self.role_manager.roles}
+        roles.update({role.name: role for role in self.role_manager.temp_roles})
+        return roles
+
+    def expand_jobs(self):
+        roles = self.available_roles()
+        role_names = self.role_names if self.role_names else list(roles.keys())
+        missing = [name for name in role_names if name not in roles]
+        if missing:
+            raise ValueError(f"Roles not found: {missing}")
+
+        pairings = list(itertools.combinations(role_names, 2))
+        if self.self_play:
+            pairings += [(name, name) for name in role_names]
+
+        jobs = []
+        for pairing in pairings:
+            # Local strategy roles take no model, so only LLM seats are crossed with the model list
+            seat_options = []
+            for name in pairing:
+                role = roles[name]
+                if not role.is_llm:
+                    seat_options.append([None])
+                elif self.models:
+                    seat_options.append(self.models)
+                else:
+                    seat_options.append([f"{role.llm_config['provider']}/{role.llm_config['model']}"])
+            model_combos = itertools.product(*seat_options)
+
+            for combo in model_combos:
+                for repetition in range(self.repetitions):
+                    jobs.append({
+                        "job_id": len(jobs),
+                        "game": self.game_name,
+                        "repetition": repetition,
+                        "seed": self.base_seed + repetition,
+                        "cache_mode": self.cache_mode,
+                        "players": self._seat_players(roles, pairing, combo)
+                    })
+        return jobs
+
+    def _seat_players(self, roles, pairing, combo):
+        mirrored = len(set(pairing)) != len(pairing)
+        players = []
+        for seat, (role_name, provider_model) in enumerate(zip(pairing, combo), start=1):
+            provider, model = provider_model.split("/", 1) if provider_model else (None, None)
+            players.append({
+                # Player names must be unique within a game
+                "name": f"{role_name} #{seat}" if mirrored else role_name,
+                "role": role_name,
+                "behavior": roles[role_name].behavior,
+                "provider": provider,
+                "model": model,
+                "strategy": roles[role_name].strategy
+            })
+        return players
+
+    def _open_results_file(self, results_file, jobs):
+        if results_file is None:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Kept in a subdirectory so the log viewers only list game logs
+            results_file = os.path.join(self.log_directory, "tournaments", f"{self.game_name}_{timestamp}.jsonl")
+        os.makedirs(os.path.dirname(results_file) or '.', exist_ok=True)
+        self.results_file = results_file
+
+        # Each job checkpoints its game after every round, so a resumed tournament
+        # neither replays finished games nor the finished rounds of interrupted ones
+        name = os.path.splitext(os.path.basename(results_file))[0]
+        checkpoint_directory = os.path.join(self.log_directory, "checkpoints", name)
+        for job in jobs:
+            job.setdefault("checkpoint", os.path.join(checkpoint_directory, f"job_{job['job_id']}.json"))
+        manifest = self.manifest_path(results_file)
+        if not os.path.exists(manifest):
+            write_json_atomic(manifest, {"game": self.game_name, "cache_mode": self.cache_mode, "jobs": jobs})
+        return results_file
+
+    @staticmethod
+    def manifest_path(results_file):
+        """Job list saved next to the results file, read back by resume()"""
+        return os.path.splitext(results_file)[0] + ".jobs.json"
+
+    def resume(self, results_file, on_result=None):
+        """Run the jobs of an interrupted tournament that have no successful result yet.
+
+        New results are appended to the same results file; games that were
+        cut off mid-way continue from their last checkpoint.
+        """
+        manifest = read_checkpoint(self.manifest_path(results_file))
+        finished = set()
+        if os.path.exists(results_file):
+            with open(results_file, 'r') as f:
+                for line in f:
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by the crash
+                        continue
+                    if "error" not in row:
+                        finished.add(row["job_id"])
+        jobs = [job for job in manifest["jobs"] if job["job_id"] not in finished]
+        print(f"Resuming tournament: {len(finished)} finished, {len(jobs)} remaining")
+        self.game_name = manifest["game"]
+        return self.run(jobs, results_file=results_file, on_result=on_result)
+
+    def run(self, jobs=None, results_file=None, on_result=None):
+        """Run all jobs and return their results in completion order"""
+        jobs = jobs if jobs is not None else self.expand_jobs()
+        results_file = self._open_results_file(results_file, jobs)
+
+        context = multiprocessing.get_context()
+        semaphore = context.BoundedSemaphore(self.max_inflight_requests) if self.max_inflight_requests else None
+
+        results = []
+        with open(results_file, 'a') as out, concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(semaphore, 1.0 / (self.max_workers or os.cpu_count() or 1))
+        ) as executor:
+            futures = {executor.submit(run_tournament_job, job): job for job in jobs}
+            for future in concurrent.futures.as_completed(futures):
+                job = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"Tournament job {job['job_id']} failed: {e}")
+                    result = {"job_id": job["job_id"], "game": job["game"], "players": job["players"], "error": str(e)}
+
+                # Stream each finished game so partial tournaments are still usable
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                results.append(result)
+                if on_result:
+                    on_result(result, len(results), len(jobs))
+
+        print(f"Tournament results written to {results_file}")
+        return results
+
+class BatchTournamentScheduler(TournamentScheduler):
+    """Runs the same jobs through a provider batch API instead of live requests.
+
+    Every job is a MatchState. All matches advance in lock-step: the pending
+    requests of every unfinished match (round k, one phase) form a wave that
+    is submitted as one batch job per provider, and the responses are fed
+    back into the matches once the batch completes. Slower per game, but
+    batch pricing is cheaper and batch rate limits are far higher, which
+    suits overnight sweeps. Settings come from "batch_api" in config.json.
+    """
+
+    def __init__(self, *args, endpoint=None, poll_interval=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        batch_config = ConfigManager().get_config('batch_api') or {}
+        self.endpoint = endpoint or batch_config.get('endpoint', 'openai')
+        self.poll_interval = poll_interval if poll_interval is not None else batch_config.get('poll_interval', 30)
+        self.completion_window = batch_config.get('completion_window', '24h')
+        self.batch_directory = batch_config.get('directory', 'cache/batches')
+
+    def run(self, jobs=None, results_file=None, on_result=None):
+        """Play all jobs wave by wave and return their results in completion order"""
+        from .main_controller import MainController
+        from .batch_api import BatchExecutor
+        from .game_rules import GameRules
+        from .logging_module import LoggingModule
+        from .match_state import MatchState
+
+        jobs = jobs if jobs is not None else self.expand_jobs()
+        results_file = self._open_results_file(results_file, jobs)
+
+        controller = MainController(role_manager=self.role_manager, cache_mode=self.cache_mode)
+        executor = BatchExecutor(
+            controller.llm_access,
+            endpoint=self.endpoint,
+            directory=self.batch_directory,
+            poll_interval=self.poll_interval,
+            completion_window=self.completion_window
+        )
+        game_rules = GameRules(self.game_name, sink=controller.sink)
+
+        results = []
+        with open(results_file, 'a') as out:
+            def finish(job, result):
+                out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                out.flush()
+                results.append(result)
+                if on_result:
+                    on_result(result, len(results), len(jobs))
+
+            matches = []
+            for job in jobs:
+                try:
+                    # Interleaved matches each need their own log file
+                    logging = LoggingModule(controller.logging.log_directory, controller.logging.log_format,
+                                            controller.logging.index)
+                    if os.path.exists(job["checkpoint"]):
+                        match = MatchState.resume(controller, read_checkpoint(job["checkpoint"]), game_rules=game_rules,
+                                                  logging=logging, checkpoint_path=job["checkpoint"])
+                    else:
+                        match = MatchState(controller, game_rules, _job_roles(job), logging=logging,
+                                           checkpoint_path=job["checkpoint"])
+                except Exception as e:
+                    print(f"Tournament job {job['job_id']} failed: {e}")
+                    finish(job, {"job_id": job["job_id"], "game": job["game"], "players": job["players"], "error": str(e)})
+                    continue
+                if match.finished:
+                    finish(job, _job_result(job, match.game_state))
+                else:
+                    matches.append((job, match))
+
+            wave = 0
+            batch_prefix = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+            while matches:
+                # Matches without LLM players (or in a phase without requests) still advance with the wave
+                pending = [(job, match, match.pending_requests()) for job, match in matches]
+                requests = [request for _, _, match_requests in pending for request in match_requests]
+                print(f"Batch wave {wave}: {len(requests)} requests from {len(pending)} matches")
+                responses = executor.send_all(requests, wave_id=f"{batch_prefix}_w{wave}") if requests else []
+
+                still_running = []
+                offset = 0
+                for job, match, match_requests in pending:
+                    match_responses = responses[offset:offset + len(match_requests)]
+                    offset += len(match_requests)
+                    try:
+                        match.submit_responses(match_responses)
+                    except Exception as e:
+                        print(f"Tournament job {job['job_id']} failed: {e}")
+                        finish(job, {"job_id": job["job_id"], "game": job["game"], "players": job["players"], "error": str(e)})
+                        continue
+                    if match.finished:
+                        finish(job, _job_result(job, match.game_state))
+                    else:
+                        still_running.append((job, match))
+                matches = still_running
+                wave += 1
+
+        print(f"Tournament results written to {results_file}")
+        return results